@@ -0,0 +1,59 @@
+# Compares the DFA construction backends on a corpus of patterns:
+#
+#   python bench/bench_construction.py [repeat]
+#
+# For every pattern and backend it prints the best time over `repeat` runs
+# and the number of DFA states before and after minimize().
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.Derivatives import derivative_dfa
+from src.Glushkov import followpos_dfa
+from src.Regex import parse_regex
+
+CORPUS = [
+    'c(a | b)*',
+    '(ab | cd+ | b*)? efg',
+    '(a|(bb*a))(a|(bb*a))*',
+    '[A-Z]?([a-z]*[0-9])*',
+    '(a|b)*c(a|b)*c(a|b)*',
+    'a(b|c)(d|e)|abb|abc',
+    '(this_needs_to_match_a_really_long_string_or_nothing)?',
+    '([A-Z]|[a-z]|[0-9])+@[a-z]+.[a-z]+',
+    '((-|.)(-|.)(-|.))|(.(-|.)(--|-.|..))|(-(-.|..|.-)(-|.))',
+    '[0-9]+((\\+|-)[0-9]+)*',
+    '(a|b)*a(a|b)(a|b)(a|b)(a|b)(a|b)(a|b)(a|b)',
+    '|'.join(f'key{i}=[0-9]+' for i in range(40)),
+    '(' + '|'.join('abcdefghij'[:k] for k in range(1, 11)) + ')*x',
+]
+
+BACKENDS = {
+    'thompson+subset': lambda ast: ast.thompson().subset_construction(),
+    'thompson+subset (ranges)': lambda ast: ast.thompson(char_ranges=True).subset_construction(bitset=True),
+    'followpos': lambda ast: followpos_dfa(ast),
+    'followpos (ranges)': lambda ast: followpos_dfa(ast, char_ranges=True),
+    'derivatives': lambda ast: derivative_dfa(ast),
+    'derivatives (ranges)': lambda ast: derivative_dfa(ast, char_ranges=True),
+}
+
+def main(repeat: int = 5) -> None:
+    totals = dict.fromkeys(BACKENDS, 0.0)
+
+    for pattern in CORPUS:
+        ast = parse_regex(pattern)
+        print(pattern if len(pattern) <= 72 else pattern[:69] + '...')
+        for name, build in BACKENDS.items():
+            seconds = min(timeit.repeat(lambda: build(ast), number=1, repeat=repeat))
+            totals[name] += seconds
+            dfa = build(ast)
+            print(f'  {name:<26} {seconds * 1000:9.2f} ms  {len(dfa.K):6} states  {len(dfa.minimize().K):6} minimized')
+
+    print('total')
+    for name, seconds in totals.items():
+        print(f'  {name:<26} {seconds * 1000:9.2f} ms')
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,112 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+
+from .CharSet import CharSet
+from .CompiledDFA import CompiledDFA, TABLE_TYPECODE
+from .PatternCache import build_dfa
+
+# layout (all integers little-endian uint32):
+#   header      magic, version, states, stride, q0, dead, symbol table size
+#   symbols     count, then (first code point, last code point, class) per
+#               interval; single characters are one-point intervals
+#   accepting   one byte per state, zero padded to a multiple of 4
+#   table       states * stride next-state offsets
+MAGIC = b'RXDFA\0\0\0'
+FORMAT_VERSION = 2
+HEADER = struct.Struct('<8s6I')
+ENTRY = struct.Struct('<3I')
+
+def padded(n: int) -> int:
+    return (n + 3) & ~3
+
+def dumps(compiled: CompiledDFA) -> bytes:
+    entries = [(lo, hi, cls) for symbol, cls in compiled.classes.items() for lo, hi in CharSet.of(symbol).ranges]
+    symbols = struct.pack('<I', len(entries)) + b''.join(ENTRY.pack(*entry) for entry in entries)
+
+    n_states = compiled.n_states
+    accepting = bytes(compiled.accepting) + bytes(padded(n_states) - n_states)
+
+    table = array(TABLE_TYPECODE, compiled.table)
+    if sys.byteorder == 'big':
+        table.byteswap()
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, n_states, compiled.stride, compiled.q0, compiled.dead, len(symbols))
+    return header + symbols + accepting + table.tobytes()
+
+def loads(buffer) -> CompiledDFA:
+    # zero-copy: the table and accepting flags are views into `buffer`
+    view = memoryview(buffer)
+    magic, version, n_states, stride, q0, dead, symbols_size = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError('not a compiled DFA file')
+    if version != FORMAT_VERSION:
+        raise ValueError(f'unsupported compiled DFA format version: {version}')
+
+    offset = HEADER.size
+    count, = struct.unpack_from('<I', view, offset)
+    classes = {}
+    for lo, hi, cls in ENTRY.iter_unpack(view[offset + 4:offset + 4 + count * ENTRY.size]):
+        classes[chr(lo) if lo == hi else CharSet(((lo, hi),))] = cls
+    offset += symbols_size
+
+    if len(view) < offset + padded(n_states) + 4 * n_states * stride:
+        raise ValueError('truncated compiled DFA file')
+    accepting = view[offset:offset + n_states]
+    offset += padded(n_states)
+
+    table = view[offset:offset + 4 * n_states * stride].cast(TABLE_TYPECODE)
+    if sys.byteorder == 'big':
+        table = array(TABLE_TYPECODE, table)
+        table.byteswap()
+
+    return CompiledDFA(classes=classes, stride=stride, q0=q0, dead=dead, table=table, accepting=accepting)
+
+def dump(compiled: CompiledDFA, path: str | os.PathLike) -> None:
+    # write-then-rename, so readers never map a half written file
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(dumps(compiled))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def load(path: str | os.PathLike) -> CompiledDFA:
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return loads(mapped)
+
+class DiskCache:
+    # content addressed: the file name is a hash of the format version and the pattern
+    def __init__(self, directory: str | os.PathLike):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, pattern: str) -> Path:
+        key = hashlib.sha256(f'{FORMAT_VERSION}:{pattern}'.encode('utf-8')).hexdigest()
+        return self.directory / f'{key}.dfa'
+
+    def get(self, pattern: str) -> CompiledDFA:
+        path = self.path(pattern)
+        # a missing, truncated or corrupt entry is rebuilt and overwritten
+        try:
+            return load(path)
+        except (FileNotFoundError, ValueError, struct.error):
+            pass
+
+        compiled = build_dfa(pattern).compile()
+        dump(compiled, path)
+        return compiled
+
+    def invalidate(self, pattern: str | None = None) -> None:
+        paths = [self.path(pattern)] if pattern is not None else self.directory.glob('*.dfa')
+        for path in paths:
+            path.unlink(missing_ok=True)
@@ -0,0 +1,72 @@
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+@dataclass(frozen=True, order=True)
+class CharSet:
+    # sorted, disjoint, non-adjacent inclusive code point intervals
+    ranges: tuple[tuple[int, int], ...]
+
+    @staticmethod
+    def from_ranges(ranges: Iterable[tuple[int, int]]) -> 'CharSet':
+        merged = []
+        for lo, hi in sorted(ranges):
+            if lo > hi:
+                continue
+            if merged and lo <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+            else:
+                merged.append((lo, hi))
+        return CharSet(tuple(merged))
+
+    @staticmethod
+    def of(symbol: 'str | CharSet') -> 'CharSet':
+        if isinstance(symbol, CharSet):
+            return symbol
+        return CharSet(((ord(symbol), ord(symbol)),))
+
+    @staticmethod
+    def partition(symbols: Iterable['str | CharSet']) -> dict['str | CharSet', list['str | CharSet']]:
+        # split overlapping symbols on every interval boundary; each symbol maps
+        # to the disjoint pieces covering it, single code points as plain str
+        intervals = {symbol: CharSet.of(symbol).ranges for symbol in symbols}
+        points = sorted({p for ranges in intervals.values() for lo, hi in ranges for p in (lo, hi + 1)})
+
+        pieces = {}
+        for symbol, ranges in intervals.items():
+            covering = []
+            for lo, hi in ranges:
+                k = bisect_left(points, lo)
+                while points[k] <= hi:
+                    start, end = points[k], points[k + 1] - 1
+                    covering.append(chr(start) if start == end else CharSet(((start, end),)))
+                    k += 1
+            pieces[symbol] = covering
+
+        return pieces
+
+    @staticmethod
+    def alphabet(symbols: Iterable['str | CharSet'], char_ranges: bool = False) -> dict['str | CharSet', str]:
+        # the DFA alphabet over these symbols, each with one representative
+        # character: single characters (what thompson() uses by default), or
+        # with char_ranges the disjoint interval pieces
+        pieces = {piece for covering in CharSet.partition(symbols).values() for piece in covering}
+        if not char_ranges:
+            return {c: c for piece in pieces for c in CharSet.of(piece).chars()}
+        return {piece: piece if isinstance(piece, str) else chr(piece.ranges[0][0]) for piece in pieces}
+
+    def __contains__(self, c: str) -> bool:
+        code = ord(c)
+        k = bisect_right(self.ranges, (code, 0x10FFFF)) - 1
+        return k >= 0 and self.ranges[k][0] <= code <= self.ranges[k][1]
+
+    def __len__(self) -> int:
+        return sum(hi - lo + 1 for lo, hi in self.ranges)
+
+    def chars(self) -> Iterator[str]:
+        for lo, hi in self.ranges:
+            for code in range(lo, hi + 1):
+                yield chr(code)
+
+    def __str__(self) -> str:
+        return '[' + ''.join(chr(lo) if lo == hi else f'{chr(lo)}-{chr(hi)}' for lo, hi in self.ranges) + ']'
@@ -0,0 +1,262 @@
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from .CharSet import CharSet
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# transition tables are stored as row offsets (state * stride) so that a step
+# is a single index: next = table[offset + class]
+TABLE_TYPECODE = 'I'
+
+# characters resolved through interval symbols are memoized up to this many entries
+LOOKUP_LIMIT = 1 << 16
+
+# accept_many steps a dense batch x longest-word matrix; longer words are run
+# one at a time so that a single long word cannot blow up the matrix
+MAX_BATCH_WIDTH = 1 << 10
+
+@dataclass
+class CompiledDFA:
+    classes: dict[str | CharSet, int]
+    stride: int
+    q0: int
+    dead: int
+    table: array | memoryview
+    accepting: bytearray | memoryview
+    lookup: dict[str, int] = field(init=False, repr=False, compare=False)
+    ranges: list[tuple[int, int, int]] = field(init=False, repr=False, compare=False)
+    byte_classes: array = field(init=False, repr=False, compare=False)
+    _batch_tables: tuple | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.lookup = {symbol: cls for symbol, cls in self.classes.items() if isinstance(symbol, str)}
+        self.ranges = sorted((lo, hi, cls) for symbol, cls in self.classes.items()
+                             if isinstance(symbol, CharSet) for lo, hi in symbol.ranges)
+        # bytes are read as latin-1 code points
+        self.byte_classes = array(TABLE_TYPECODE, [self.classify(chr(b)) for b in range(256)])
+
+    @property
+    def unknown_class(self) -> int:
+        # last column of every row: symbols outside the alphabet go to the dead state
+        return self.stride - 1
+
+    @property
+    def n_states(self) -> int:
+        return len(self.table) // self.stride
+
+    @staticmethod
+    def live_states(dfa) -> set:
+        # states from which some final state can still be reached
+        sources = {}
+        for (state, _), next_state in dfa.d.items():
+            sources.setdefault(next_state, []).append(state)
+
+        live = set(dfa.F)
+        stack = list(live)
+        while stack:
+            for state in sources.get(stack.pop(), ()):
+                if state not in live:
+                    live.add(state)
+                    stack.append(state)
+        return live
+
+    @staticmethod
+    def state_order(dfa) -> list:
+        # dense renumbering in BFS order from q0. Unreachable states are
+        # dropped, and so are states that can never accept (such as the
+        # empty-set sink of subset_construction): their transitions go to the
+        # dead state instead, so matchers see a dead end as soon as it happens.
+        # State i of the compiled table (row offset i * stride) is order[i].
+        live = CompiledDFA.live_states(dfa)
+        order = [dfa.q0]
+        seen = {dfa.q0}
+        for state in order:
+            for symbol in dfa.S:
+                next_state = dfa.d.get((state, symbol))
+                if next_state in live and next_state not in seen:
+                    seen.add(next_state)
+                    order.append(next_state)
+        return order
+
+    @staticmethod
+    def from_dfa(dfa) -> 'CompiledDFA':
+        symbols = list(dfa.S)
+        order = CompiledDFA.state_order(dfa)
+        numbering = {state: i for i, state in enumerate(order)}
+
+        # alphabet compression: symbols whose columns are identical in every
+        # state share one class, and the table stores one column per class
+        dead = len(order)
+        columns = {}
+        classes = {}
+        for symbol in symbols:
+            column = tuple(numbering.get(dfa.d.get((state, symbol)), dead) for state in order)
+            classes[symbol] = columns.setdefault(column, len(columns))
+
+        stride = len(columns) + 1
+        table = array(TABLE_TYPECODE, [dead * stride]) * ((dead + 1) * stride)
+
+        for column, cls in columns.items():
+            for state, next_state in enumerate(column):
+                table[state * stride + cls] = next_state * stride
+
+        accepting = bytearray(dead + 1)
+        for state in order:
+            if state in dfa.F:
+                accepting[numbering[state]] = 1
+
+        return CompiledDFA(classes=classes, stride=stride, q0=0, dead=dead * stride, table=table, accepting=accepting)
+
+    def classify(self, symbol: str) -> int:
+        cls = self.lookup.get(symbol)
+        if cls is not None:
+            return cls
+
+        cls = self.unknown_class
+        code = ord(symbol)
+        k = bisect_right(self.ranges, (code, 0x10FFFF, 0)) - 1
+        if k >= 0 and self.ranges[k][0] <= code <= self.ranges[k][1]:
+            cls = self.ranges[k][2]
+
+        if len(self.lookup) < LOOKUP_LIMIT:
+            self.lookup[symbol] = cls
+        return cls
+
+    def is_accepting(self, offset: int) -> bool:
+        return self.accepting[offset // self.stride] == 1
+
+    def run(self, word: str | bytes, offset: int | None = None) -> int:
+        table = self.table
+        state = self.q0 if offset is None else offset
+
+        if isinstance(word, (bytes, bytearray, memoryview)):
+            byte_classes = self.byte_classes
+            for b in word:
+                state = table[state + byte_classes[b]]
+        elif self.ranges:
+            lookup = self.lookup
+            for symbol in word:
+                cls = lookup.get(symbol)
+                if cls is None:
+                    cls = self.classify(symbol)
+                state = table[state + cls]
+        else:
+            lookup = self.lookup
+            unknown = self.stride - 1
+            for symbol in word:
+                state = table[state + lookup.get(symbol, unknown)]
+
+        return state
+
+    def accept(self, word: str | bytes) -> bool:
+        return self.accepting[self.run(word) // self.stride] == 1
+
+    def state_map(self, word: str | bytes) -> list[int]:
+        # the offset reached from every state (by state index) after reading
+        # word. All states are run side by side; states that land on the same
+        # state merge, and once a single one is left the rest is a plain run
+        table = self.table
+        stride = self.stride
+        classify = self.byte_classes.__getitem__ if isinstance(word, (bytes, bytearray, memoryview)) else self.classify
+
+        current = list(range(0, self.n_states * stride, stride))
+        groups = [[k] for k in range(self.n_states)]
+
+        i = 0
+        while i < len(word) and len(current) > 1:
+            cls = classify(word[i])
+            i += 1
+            merged = {}
+            for state, group in zip(current, groups):
+                next_state = table[state + cls]
+                if next_state in merged:
+                    merged[next_state].extend(group)
+                else:
+                    merged[next_state] = group
+            current = list(merged)
+            groups = list(merged.values())
+
+        if i < len(word) and current[0] != self.dead:
+            current[0] = self.run(word[i:], current[0])
+
+        result = [self.dead] * self.n_states
+        for state, group in zip(current, groups):
+            for k in group:
+                result[k] = state
+        return result
+
+    def batch_tables(self) -> tuple:
+        # views over the offset table and the accepting flags, without a copy
+        # (the table may live in shared memory or a mapped file), plus sorted
+        # (start, end, class) intervals covering every symbol, searched with
+        # np.searchsorted
+        if self._batch_tables is None:
+            transitions = np.frombuffer(self.table, dtype=np.dtype(TABLE_TYPECODE))
+
+            intervals = sorted(self.ranges + [(ord(symbol), ord(symbol), cls) for symbol, cls in self.lookup.items()
+                                              if symbol in self.classes])
+            lookup = np.array(intervals, dtype=np.int64).reshape(-1, 3)
+
+            accepting = np.frombuffer(self.accepting, dtype=np.uint8)
+            self._batch_tables = (transitions, lookup, accepting)
+
+        return self._batch_tables
+
+    def accept_many(self, words: Iterable[str], batch_size: int = 1 << 16):
+        words = list(words)
+        if np is None:
+            return [self.accept(word) for word in words]
+
+        transitions, lookup, accepting = self.batch_tables()
+        class_type = np.min_scalar_type(self.stride)
+        result = np.empty(len(words), dtype=bool)
+
+        batched = []
+        for i, word in enumerate(words):
+            if len(word) > MAX_BATCH_WIDTH:
+                result[i] = self.accept(word)
+            else:
+                batched.append(i)
+        batched = np.array(batched, dtype=np.int64)
+
+        for start in range(0, len(batched), batch_size):
+            indexes = batched[start:start + batch_size]
+            batch = [words[i] for i in indexes]
+            lengths = np.fromiter(map(len, batch), dtype=np.int64, count=len(batch))
+
+            # longest words first, so column j only touches the rows still running
+            order = np.argsort(-lengths, kind='stable')
+            lengths = lengths[order]
+            joined = ''.join(batch[i] for i in order)
+
+            codepoints = np.frombuffer(joined.encode('utf-32-le', errors='surrogatepass'), dtype=np.uint32).astype(np.int64)
+            if len(lookup):
+                k = np.maximum(np.searchsorted(lookup[:, 0], codepoints, side='right') - 1, 0)
+                hit = (lookup[k, 0] <= codepoints) & (codepoints <= lookup[k, 1])
+                classes = np.where(hit, lookup[k, 2], self.unknown_class)
+            else:
+                classes = np.full(len(codepoints), self.unknown_class)
+
+            # cells past the end of a word are never read
+            width = int(lengths[0]) if len(batch) else 0
+            matrix = np.zeros((len(batch), width), dtype=class_type)
+            rows = np.repeat(np.arange(len(batch)), lengths)
+            starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+            matrix[rows, np.arange(len(codepoints)) - starts] = classes
+
+            # states are row offsets, stepped like run() does
+            states = np.full(len(batch), self.q0, dtype=np.int64)
+            active = len(batch) - np.searchsorted(lengths[::-1], np.arange(width), side='right')
+            for j in range(width):
+                n = active[j]
+                states[:n] = transitions[states[:n] + matrix[:n, j]]
+
+            result[indexes[order]] = accepting[states // self.stride] == 1
+
+        return result
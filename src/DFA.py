@@ -1,10 +1,13 @@
-from collections.abc import Callable
-from dataclasses import dataclass
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
 from itertools import product
 #import pandas as pd
 from typing import TypeVar
 from functools import reduce
 
+from .CompiledDFA import CompiledDFA
+from .StreamMatcher import StreamMatcher
+
 STATE = TypeVar('STATE')
 
 @dataclass
@@ -14,15 +17,22 @@ class DFA[STATE]:
     q0: STATE
     d: dict[tuple[STATE, str], STATE]
     F: set[STATE]
+    _compiled: CompiledDFA | None = field(default=None, init=False, repr=False, compare=False)
 
+    def compile(self) -> CompiledDFA:
+        # the table is a snapshot: build a new DFA instead of mutating d afterwards
+        if self._compiled is None:
+            self._compiled = CompiledDFA.from_dfa(self)
+        return self._compiled
 
     def accept(self, word: str) -> bool:
-        current_state = self.q0
+        return self.compile().accept(word)
+
+    def accept_many(self, words: Iterable[str]):
+        return self.compile().accept_many(words)
 
-        for symbol in word:
-            current_state = self.d(current_state, symbol)
-    
-        return current_state in self.F
+    def matcher(self) -> StreamMatcher:
+        return StreamMatcher(self.compile())
 
     def split_states(self, states: set[STATE], partition: list[set[STATE]]) -> list[set[STATE]]:
         group = {}
@@ -49,11 +59,18 @@ class DFA[STATE]:
         
         return list(group.values())
 
-    def minimize(self) -> 'DFA[STATE]':
-        accepting_states = self.F
-        non_accepting_states = self.K - self.F
+    def state_label(self, state: STATE) -> object:
+        # states with different labels are never merged by minimize
+        return state in self.F
+
+    def initial_partition(self) -> list[set[STATE]]:
+        groups = {}
+        for state in self.K:
+            groups.setdefault(self.state_label(state), set()).add(state)
+        return list(groups.values())
 
-        current_partition = [accepting_states, non_accepting_states]
+    def moore_partition(self) -> list[set[STATE]]:
+        current_partition = self.initial_partition()
         changed = True
 
         while changed:
@@ -68,12 +85,97 @@ class DFA[STATE]:
 
             current_partition = new_partition
 
+        return current_partition
+
+    def hopcroft_partition(self) -> list[set[STATE]]:
+        # missing transitions go to an implicit sink, so the refinement
+        # always works on a complete automaton
+        sink = object()
+
+        inverse = {symbol: {} for symbol in self.S}
+        for state in self.K:
+            for symbol in self.S:
+                next_state = self.d.get((state, symbol), sink)
+                inverse[symbol].setdefault(next_state, []).append(state)
+        for symbol in self.S:
+            inverse[symbol].setdefault(sink, []).append(sink)
+
+        # the sink is a non-final state, so it starts in the same block as them
+        blocks = self.initial_partition()
+        sink_label = self.state_label(sink)
+        for block in blocks:
+            if self.state_label(next(iter(block))) == sink_label:
+                block.add(sink)
+                break
+        else:
+            blocks.append({sink})
+
+        block_of = {}
+        for i, block in enumerate(blocks):
+            for state in block:
+                block_of[state] = i
+
+        # every initial block but the largest one is a splitter
+        largest = max(range(len(blocks)), key=lambda i: len(blocks[i]))
+        worklist = [(i, symbol) for i in range(len(blocks)) if i != largest for symbol in self.S]
+        pending = set(worklist)
+
+        while worklist:
+            splitter = worklist.pop()
+            pending.discard(splitter)
+            block_id, symbol = splitter
+
+            predecessors = inverse[symbol]
+            touched = {}
+            for target in blocks[block_id]:
+                for state in predecessors.get(target, ()):
+                    touched.setdefault(block_of[state], set()).add(state)
+
+            for split_id, inside in touched.items():
+                block = blocks[split_id]
+                if len(inside) == len(block):
+                    continue
+
+                # the freshly numbered block is always the smaller half, so
+                # it is the only one that has to be (re)queued as a splitter
+                if 2 * len(inside) <= len(block):
+                    block -= inside
+                    smaller = inside
+                else:
+                    smaller = block - inside
+                    blocks[split_id] = inside
+
+                new_id = len(blocks)
+                blocks.append(smaller)
+                for state in smaller:
+                    block_of[state] = new_id
+
+                for s in self.S:
+                    if (new_id, s) not in pending:
+                        pending.add((new_id, s))
+                        worklist.append((new_id, s))
+
+        blocks[block_of[sink]].discard(sink)
+
+        return [block for block in blocks if block]
+
+    def minimize(self, method: str = 'hopcroft') -> 'DFA[int]':
+        if method == 'hopcroft':
+            current_partition = self.hopcroft_partition()
+        elif method == 'moore':
+            current_partition = self.moore_partition()
+        else:
+            raise ValueError(f"Unknown minimization method: {method}")
+
         new_states = {}
         for i, block in enumerate(current_partition):
             for state in block:
                 new_states[state] = i
 
-        new_K = set(range(len(current_partition)))
+        return self.quotient(new_states, len(current_partition))
+
+    def quotient(self, new_states: dict[STATE, int], size: int) -> 'DFA[int]':
+        new_K = set(range(size))
         new_F = {new_states[state] for state in self.F}
         new_q0 = new_states[self.q0]
 
@@ -0,0 +1,178 @@
+import os
+from collections.abc import Callable, Iterator
+from typing import TextIO
+
+from .CharSet import CharSet
+from .DFA import DFA
+
+# the #states / #initial / #accepting / #alphabet / #transitions text format
+#
+# a transition is written as `source:symbol>destination`. Names and symbols
+# are escaped so that they never contain a raw ':', '>', '\' or line break:
+# a space is written as `\\` (the convention of the reference files), the
+# usual `\n`, `\t` and `\r`, and anything else special as `\xHH` / `\uHHHH`.
+# Since state names never contain ':' and destinations never contain '>',
+# unescaped ':' / '>' symbols in older files still parse. Interval symbols
+# are written as `[a-z...]`, with '-' escaped inside the brackets.
+SECTIONS = ('#states', '#initial', '#accepting', '#alphabet', '#transitions')
+
+ESCAPES = {' ': '\\\\', '\n': '\\n', '\t': '\\t', '\r': '\\r'}
+UNESCAPES = {'\\': ' ', 'n': '\n', 't': '\t', 'r': '\r'}
+SPECIAL = {':', '>', '\\', '#', '[', ']'}
+
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+def escape(text: str) -> str:
+    out = []
+    for c in text:
+        if c in ESCAPES:
+            out.append(ESCAPES[c])
+        elif c in SPECIAL or not c.isprintable():
+            out.append(f'\\x{ord(c):02x}' if ord(c) < 0x100 else f'\\u{ord(c):04x}' if ord(c) < 0x10000 else f'\\U{ord(c):08x}')
+        else:
+            out.append(c)
+    return ''.join(out)
+
+def unescape(text: str) -> str:
+    if '\\' not in text:
+        return text
+
+    out = []
+    i = 0
+    while i < len(text):
+        c = text[i]
+        if c != '\\' or i + 1 == len(text):
+            out.append(c)
+            i += 1
+            continue
+
+        code = text[i + 1]
+        width = {'x': 2, 'u': 4, 'U': 8}.get(code)
+        if width is not None:
+            out.append(chr(int(text[i + 2:i + 2 + width], 16)))
+            i += 2 + width
+        elif code in UNESCAPES:
+            out.append(UNESCAPES[code])
+            i += 2
+        else:
+            raise ValueError(f'Invalid escape sequence: \\{code}')
+
+    return ''.join(out)
+
+def format_symbol(symbol: str | CharSet) -> str:
+    if isinstance(symbol, str):
+        return escape(symbol)
+
+    def bound(code: int) -> str:
+        return '\\x2d' if code == ord('-') else escape(chr(code))
+
+    return '[' + ''.join(bound(lo) if lo == hi else f'{bound(lo)}-{bound(hi)}' for lo, hi in symbol.ranges) + ']'
+
+def parse_symbol(text: str) -> str | CharSet:
+    if not (text.startswith('[') and text.endswith(']') and len(text) > 1):
+        return unescape(text)
+
+    # a raw '-' joins the last character before it with the first one after it
+    intervals = []
+    for i, part in enumerate(text[1:-1].split('-')):
+        codes = [ord(c) for c in unescape(part)]
+        if i > 0:
+            if not intervals or not codes:
+                raise ValueError(f'Invalid interval symbol: {text}')
+            intervals[-1] = (intervals[-1][0], codes.pop(0))
+        intervals.extend((code, code) for code in codes)
+
+    return CharSet.from_ranges(intervals)
+
+def lines(f: TextIO, buffer_size: int = DEFAULT_BUFFER_SIZE) -> Iterator[str]:
+    # large block reads, split in memory; the partial last line is carried over
+    rest = ''
+    while True:
+        block = f.read(buffer_size)
+        if not block:
+            break
+        block = rest + block
+        parts = block.split('\n')
+        rest = parts.pop()
+        for line in parts:
+            yield line.rstrip('\r')
+    if rest:
+        yield rest.rstrip('\r')
+
+def iter_dfa(f: TextIO, buffer_size: int = DEFAULT_BUFFER_SIZE) -> Iterator[tuple[str, object]]:
+    # yields (section, item) pairs: a state name for #states/#initial/#accepting,
+    # a symbol for #alphabet and a (source, symbol, destination) triple for #transitions
+    section = None
+    expected = iter(SECTIONS)
+
+    for number, line in enumerate(lines(f, buffer_size), 1):
+        if line in SECTIONS:
+            if line != next(expected, None):
+                raise ValueError(f'Unexpected section: {line}')
+            section = line
+            continue
+
+        if section is None:
+            raise ValueError('invalid file format')
+        if not line:
+            continue
+
+        try:
+            if section == '#transitions':
+                source, _, rest = line.partition(':')
+                symbol, separator, destination = rest.rpartition('>')
+                if not separator:
+                    raise ValueError(f'Invalid transition: {line}')
+                item = (unescape(source), parse_symbol(symbol), unescape(destination))
+            elif section == '#alphabet':
+                item = parse_symbol(line)
+            else:
+                item = unescape(line)
+        except ValueError as e:
+            raise ValueError(f'line {number}: {e}') from e
+        yield section, item
+
+def read_dfa(source: str | os.PathLike | TextIO, buffer_size: int = DEFAULT_BUFFER_SIZE) -> DFA[str]:
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding='utf-8') as f:
+            return read_dfa(f, buffer_size)
+
+    S, K, F, d = set(), set(), set(), {}
+    q0 = None
+
+    for section, item in iter_dfa(source, buffer_size):
+        if section == '#transitions':
+            state, symbol, next_state = item
+            d[(state, symbol)] = next_state
+        elif section == '#alphabet':
+            S.add(item)
+        elif section == '#states':
+            K.add(item)
+        elif section == '#initial':
+            q0 = item
+        else:
+            F.add(item)
+
+    if q0 is None:
+        raise ValueError('missing initial state')
+
+    return DFA(S=S, K=K, q0=q0, d=d, F=F)
+
+def write_dfa(dfa: DFA, target: str | os.PathLike | TextIO, name: Callable[[object], str] = str) -> None:
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, 'w', encoding='utf-8') as f:
+            return write_dfa(dfa, f, name)
+
+    names = {state: escape(name(state)) for state in dfa.K | {dfa.q0}}
+    symbols = {symbol: format_symbol(symbol) for symbol in dfa.S}
+
+    target.write('#states\n')
+    target.writelines(f'{names[state]}\n' for state in dfa.K)
+    target.write(f'#initial\n{names[dfa.q0]}\n')
+    target.write('#accepting\n')
+    target.writelines(f'{names[state]}\n' for state in dfa.F)
+    target.write('#alphabet\n')
+    target.writelines(f'{symbols[symbol]}\n' for symbol in dfa.S)
+    target.write('#transitions\n')
+    target.writelines(f'{names[state]}:{symbols[symbol]}>{names[next_state]}\n'
+                      for (state, symbol), next_state in dfa.d.items())
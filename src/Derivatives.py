@@ -0,0 +1,220 @@
+from .CharSet import CharSet
+from .DFA import DFA
+from .Regex import Regex, Epsilon, Character, CharClass, Union, Concatenation, Star, Plus, QuestionMark, operands
+
+EMPTY = 'empty'
+EPS = 'eps'
+SYMBOL = 'symbol'
+CAT = 'cat'
+OR = 'or'
+STAR = 'star'
+
+class Term:
+    # hash-consed: a Terms table hands out exactly one Term per structure, so
+    # identity is structural equality and the default hash is enough
+    __slots__ = ('kind', 'args', 'nullable')
+
+    def __init__(self, kind: str, args: tuple, nullable: bool):
+        self.kind = kind
+        self.args = args
+        self.nullable = nullable
+
+class Terms:
+    # smart constructors that normalize while building: unions are flattened,
+    # deduplicated and unordered (ACI) and drop the empty language, epsilon is
+    # the unit of concatenation, concatenations lean right, and stars collapse
+    def __init__(self):
+        self.table: dict[tuple, Term] = {}
+        self.derivatives: dict[tuple[Term, str], Term] = {}
+        self.empty = self.intern(EMPTY, (), False)
+        self.eps = self.intern(EPS, (), True)
+
+    def intern(self, kind: str, args: tuple, nullable: bool) -> Term:
+        key = (kind, args)
+        term = self.table.get(key)
+        if term is None:
+            term = self.table[key] = Term(kind, args, nullable)
+        return term
+
+    def symbol(self, charset: CharSet) -> Term:
+        if not charset.ranges:
+            return self.empty
+        return self.intern(SYMBOL, (charset,), False)
+
+    def cat(self, left: Term, right: Term) -> Term:
+        if left is self.empty or right is self.empty:
+            return self.empty
+        if left is self.eps:
+            return right
+        if right is self.eps:
+            return left
+        # the first operand of a CAT is never a CAT, so a left CAT chain is
+        # taken apart along its right spine and folded back onto right
+        chain = []
+        while left.kind == CAT:
+            first, left = left.args
+            chain.append(first)
+        chain.append(left)
+
+        for term in reversed(chain):
+            right = self.intern(CAT, (term, right), term.nullable and right.nullable)
+        return right
+
+    def union(self, *terms: Term) -> Term:
+        members = set()
+        for term in terms:
+            if term.kind == OR:
+                members.update(term.args[0])
+            elif term is not self.empty:
+                members.add(term)
+
+        # epsilon adds nothing next to another nullable member
+        if self.eps in members and any(term.nullable for term in members if term is not self.eps):
+            members.discard(self.eps)
+
+        if not members:
+            return self.empty
+        if len(members) == 1:
+            return members.pop()
+        return self.intern(OR, (frozenset(members),), any(term.nullable for term in members))
+
+    def star(self, term: Term) -> Term:
+        if term is self.empty or term is self.eps:
+            return self.eps
+        if term.kind == STAR:
+            return term
+        return self.intern(STAR, (term,), True)
+
+    def from_regex(self, regex: Regex) -> Term:
+        # post-order on an explicit stack; nodes are interned, so a
+        # subexpression that occurs several times is converted once. A chain
+        # of Concatenation (or Union) nodes is converted as a whole from its
+        # top node, with the operands of the chain as its parts
+        converted: dict[Regex, Term] = {}
+        stack = [regex]
+
+        while stack:
+            node = stack.pop()
+            if node in converted:
+                continue
+
+            children = operands(node)
+            pending = [child for child in children if child not in converted]
+            if pending:
+                stack.append(node)
+                stack.extend(pending)
+                continue
+
+            parts = [converted[child] for child in children]
+            if isinstance(node, Epsilon):
+                term = self.eps
+            elif isinstance(node, Character):
+                term = self.symbol(CharSet.of(node.c))
+            elif isinstance(node, CharClass):
+                term = self.symbol(node.charset)
+            elif isinstance(node, Union):
+                term = self.union(*parts)
+            elif isinstance(node, Concatenation):
+                term = self.eps
+                for part in reversed(parts):
+                    term = self.cat(part, term)
+            elif isinstance(node, Star):
+                term = self.star(*parts)
+            elif isinstance(node, Plus):
+                inner, = parts
+                term = self.cat(inner, self.star(inner))
+            elif isinstance(node, QuestionMark):
+                term = self.union(parts[0], self.eps)
+            else:
+                raise ValueError(f'Unsupported regex node: {type(node).__name__}')
+            converted[node] = term
+
+        return converted[regex]
+
+    def derive(self, term: Term, c: str) -> Term:
+        # the Brzozowski derivative: what is left of term after reading c.
+        # Post-order on an explicit stack, so that deeply nested terms (long
+        # chains of nullable concatenations, say) do not hit the recursion limit
+        derivatives = self.derivatives
+        stack = [term]
+
+        while stack:
+            node = stack[-1]
+            if (node, c) in derivatives:
+                stack.pop()
+                continue
+
+            if node.kind == CAT:
+                left, right = node.args
+                parts = (left, right) if left.nullable else (left,)
+            elif node.kind == OR:
+                parts = tuple(node.args[0])
+            elif node.kind == STAR:
+                parts = node.args
+            else:
+                parts = ()
+
+            pending = [part for part in parts if (part, c) not in derivatives]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+
+            if node.kind == SYMBOL:
+                result = self.eps if c in node.args[0] else self.empty
+            elif node.kind == CAT:
+                result = self.cat(derivatives[(left, c)], right)
+                if left.nullable:
+                    result = self.union(result, derivatives[(right, c)])
+            elif node.kind == OR:
+                result = self.union(*(derivatives[(member, c)] for member in parts))
+            elif node.kind == STAR:
+                result = self.cat(derivatives[(parts[0], c)], node)
+            else:
+                result = self.empty
+            derivatives[(node, c)] = result
+
+        return derivatives[(term, c)]
+
+    def symbols(self, term: Term) -> set[CharSet]:
+        found = set()
+        stack = [term]
+        seen = set()
+        while stack:
+            term = stack.pop()
+            if term in seen:
+                continue
+            seen.add(term)
+            if term.kind == SYMBOL:
+                found.add(term.args[0])
+            elif term.kind == OR:
+                stack.extend(term.args[0])
+            else:
+                stack.extend(term.args)
+        return found
+
+def derivative_dfa(regex: Regex, char_ranges: bool = False) -> DFA[int]:
+    # states are the distinct (normalized) derivatives of the regex, numbered
+    # in discovery order. The alphabet is the same as the one thompson()
+    # produces: single characters, or with char_ranges the disjoint pieces
+    # of every character class
+    terms = Terms()
+    root = terms.from_regex(regex)
+
+    # one representative character decides the derivative by a whole piece
+    representatives = CharSet.alphabet(terms.symbols(root), char_ranges)
+
+    numbering = {root: 0}
+    order = [root]
+    d = {}
+    for term in order:
+        for symbol, c in representatives.items():
+            next_term = terms.derive(term, c)
+            next_state = numbering.get(next_term)
+            if next_state is None:
+                next_state = numbering[next_term] = len(order)
+                order.append(next_term)
+            d[(numbering[term], symbol)] = next_state
+
+    F = {state for state, term in enumerate(order) if term.nullable}
+    return DFA(S=set(representatives), K=set(range(len(order))), q0=0, d=d, F=F)
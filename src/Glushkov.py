@@ -0,0 +1,234 @@
+from dataclasses import dataclass, field
+
+from .CharSet import CharSet
+from .DFA import DFA
+from .NFA import NFA, bitset_move
+from .Regex import Regex, Epsilon, Character, CharClass, Union, Concatenation, Star, Plus, QuestionMark
+
+MAX_POSITIONS = 256
+
+# positions are tracked 8 at a time in the follow tables
+CHUNK_BITS = 8
+
+# characters resolved against the position sets are memoized up to this many entries
+LOOKUP_LIMIT = 1 << 16
+
+def bits(mask: int):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+@dataclass
+class Glushkov:
+    # the position automaton: every Character / CharClass leaf is a position,
+    # numbered left to right, and position i is bit i of a mask. There are no
+    # epsilon edges; reading a symbol moves to the positions that follow the
+    # current ones and whose set contains it
+    positions: list[CharSet]
+    nullable: bool
+    first: int
+    last: int
+    follow: list[int]
+
+    @staticmethod
+    def from_regex(regex: Regex) -> 'Glushkov':
+        positions = []
+        follow = []
+        # (nullable, first, last) per finished node, in post-order
+        results = []
+        stack = [(regex, False)]
+
+        while stack:
+            node, ready = stack.pop()
+            children = node.children()
+
+            if not ready and children:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(children))
+                continue
+
+            parts = results[len(results) - len(children):]
+            del results[len(results) - len(children):]
+
+            if isinstance(node, (Character, CharClass)):
+                bit = 1 << len(positions)
+                positions.append(CharSet.of(node.c) if isinstance(node, Character) else node.charset)
+                follow.append(0)
+                results.append((False, bit, bit))
+            elif isinstance(node, Epsilon):
+                results.append((True, 0, 0))
+            elif isinstance(node, Union):
+                (nullable1, first1, last1), (nullable2, first2, last2) = parts
+                results.append((nullable1 or nullable2, first1 | first2, last1 | last2))
+            elif isinstance(node, Concatenation):
+                (nullable1, first1, last1), (nullable2, first2, last2) = parts
+                for p in bits(last1):
+                    follow[p] |= first2
+                results.append((nullable1 and nullable2,
+                                first1 | first2 if nullable1 else first1,
+                                last1 | last2 if nullable2 else last2))
+            elif isinstance(node, (Star, Plus)):
+                (nullable, first, last), = parts
+                for p in bits(last):
+                    follow[p] |= first
+                results.append((nullable or isinstance(node, Star), first, last))
+            elif isinstance(node, QuestionMark):
+                (nullable, first, last), = parts
+                results.append((True, first, last))
+            else:
+                raise ValueError(f'Unsupported regex node: {type(node).__name__}')
+
+        nullable, first, last = results.pop()
+        return Glushkov(positions=positions, nullable=nullable, first=first, last=last, follow=follow)
+
+    def nfa(self, char_ranges: bool = False) -> NFA[int]:
+        # state 0 is the initial state, state i + 1 is position i
+        def symbols(charset: CharSet):
+            if char_ranges and len(charset) > 1:
+                return [charset]
+            return list(charset.chars())
+
+        alphabet = set()
+        d = {}
+        sources = [(0, self.first)] + [(p + 1, self.follow[p]) for p in range(len(self.positions))]
+        for state, targets in sources:
+            for p in bits(targets):
+                for symbol in symbols(self.positions[p]):
+                    alphabet.add(symbol)
+                    d.setdefault((state, symbol), set()).add(p + 1)
+
+        F = {p + 1 for p in bits(self.last)}
+        if self.nullable:
+            F.add(0)
+
+        return NFA(S=alphabet, K=set(range(len(self.positions) + 1)), q0=0, d=d, F=F)
+
+    def dfa(self, char_ranges: bool = False) -> DFA[int]:
+        # the Aho-Sethi-Ullman followpos construction: a DFA state is the set
+        # of positions that may be read next, plus an end marker bit (n) that
+        # follows every last position and makes the state final. States are
+        # position bitsets numbered in discovery order; no NFA is built
+        n = len(self.positions)
+        end = 1 << n
+        follow = [targets | end if self.last >> p & 1 else targets for p, targets in enumerate(self.follow)]
+        start = self.first | end if self.nullable else self.first
+
+        alphabet = CharSet.alphabet(self.positions, char_ranges)
+        moves = {}
+        for symbol, c in alphabet.items():
+            step = {p: follow[p] for p, charset in enumerate(self.positions) if c in charset}
+            moves[symbol] = (sum(1 << p for p in step), step)
+
+        numbering = {start: 0}
+        order = [start]
+        d = {}
+        for state in order:
+            for symbol, (mask, step) in moves.items():
+                next_state = bitset_move(state, mask, step)
+                number = numbering.get(next_state)
+                if number is None:
+                    number = numbering[next_state] = len(order)
+                    order.append(next_state)
+                d[(numbering[state], symbol)] = number
+
+        F = {number for number, state in enumerate(order) if state & end}
+        return DFA(S=set(alphabet), K=set(range(len(order))), q0=0, d=d, F=F)
+
+def followpos_dfa(regex: Regex, char_ranges: bool = False) -> DFA[int]:
+    return Glushkov.from_regex(regex).dfa(char_ranges)
+
+@dataclass
+class BitParallelMatcher:
+    # Shift-And over the position automaton: the set of active positions is
+    # one int, and a step is `follow(D) & mask[c]`. Follow edges from
+    # position p to p + 1 (the common case for concatenated literals) are
+    # a single shift; the remaining ones come from per-chunk tables indexed
+    # by CHUNK_BITS bits of D at a time
+    glushkov: Glushkov
+    shift_mask: int = field(init=False)
+    chunks: list[tuple[int, list[int]]] = field(init=False)
+    masks: dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        glushkov = self.glushkov
+        n = len(glushkov.positions)
+        if n > MAX_POSITIONS:
+            raise ValueError(f'pattern has {n} positions, more than {MAX_POSITIONS}')
+
+        self.shift_mask = 0
+        irregular = []
+        for p, targets in enumerate(glushkov.follow):
+            if targets >> (p + 1) & 1:
+                self.shift_mask |= 1 << p
+                targets &= ~(1 << (p + 1))
+            irregular.append(targets)
+        irregular += [0] * (-n % CHUNK_BITS)
+
+        self.chunks = []
+        for shift in range(0, n, CHUNK_BITS):
+            if not any(irregular[shift:shift + CHUNK_BITS]):
+                continue
+            table = [0] * (1 << CHUNK_BITS)
+            for value in range(1, 1 << CHUNK_BITS):
+                low = value & -value
+                table[value] = table[value ^ low] | irregular[shift + low.bit_length() - 1]
+            self.chunks.append((shift, table))
+
+        self.masks = {}
+
+    @staticmethod
+    def from_regex(regex: Regex) -> 'BitParallelMatcher':
+        return BitParallelMatcher(Glushkov.from_regex(regex))
+
+    def mask(self, c: str) -> int:
+        mask = self.masks.get(c)
+        if mask is None:
+            mask = 0
+            for p, charset in enumerate(self.glushkov.positions):
+                if c in charset:
+                    mask |= 1 << p
+            if len(self.masks) < LOOKUP_LIMIT:
+                self.masks[c] = mask
+        return mask
+
+    def step(self, active: int) -> int:
+        reached = (active & self.shift_mask) << 1
+        for shift, table in self.chunks:
+            reached |= table[(active >> shift) & ((1 << CHUNK_BITS) - 1)]
+        return reached
+
+    def accept(self, word: str | bytes) -> bool:
+        if isinstance(word, (bytes, bytearray)):
+            word = word.decode('latin-1')
+        if not word:
+            return self.glushkov.nullable
+
+        masks = self.masks
+        symbols = iter(word)
+        active = self.glushkov.first & self.mask(next(symbols))
+        for c in symbols:
+            if not active:
+                return False
+            mask = masks.get(c)
+            active = self.step(active) & (mask if mask is not None else self.mask(c))
+
+        return active & self.glushkov.last != 0
+
+    def contains(self, text: str | bytes) -> bool:
+        # unanchored: a match may start anywhere, so the first positions are
+        # re-entered at every character
+        if isinstance(text, (bytes, bytearray)):
+            text = text.decode('latin-1')
+        if self.glushkov.nullable:
+            return True
+
+        first, last = self.glushkov.first, self.glushkov.last
+        active = 0
+        for c in text:
+            mask = self.masks.get(c)
+            active = (self.step(active) | first) & (mask if mask is not None else self.mask(c))
+            if active & last:
+                return True
+
+        return False
@@ -0,0 +1,83 @@
+from collections import OrderedDict
+
+from .CharSet import CharSet
+
+DEFAULT_MAX_STATES = 4096
+
+class LazyDFA[STATE]:
+    # subset construction on demand: a DFA state (frozenset of NFA states) is
+    # only built when the input reaches it, and at most max_states of them are
+    # kept, least recently used first out
+    def __init__(self, nfa, max_states: int = DEFAULT_MAX_STATES, thrash_limit: int | None = None):
+        self.nfa = nfa
+        self.max_states = max_states
+        self.thrash_limit = max_states if thrash_limit is None else thrash_limit
+        self.cache: OrderedDict[frozenset[STATE], tuple[bool, dict[str, frozenset[STATE]]]] = OrderedDict()
+        self.evictions = 0
+        self.closures = nfa.epsilon_closures()
+        self.charsets = [symbol for symbol in nfa.S if isinstance(symbol, CharSet)]
+        self.q0 = self.closure({nfa.q0})
+
+    def closure(self, states) -> frozenset[STATE]:
+        result = set()
+        for state in states:
+            result |= self.closures[state]
+        return frozenset(result)
+
+    def move(self, states: frozenset[STATE], symbol: str) -> frozenset[STATE]:
+        symbols = [symbol] + [charset for charset in self.charsets if symbol in charset]
+        next_states = set()
+        for s in states:
+            for sym in symbols:
+                next_states |= self.nfa.d.get((s, sym), set())
+        return self.closure(next_states)
+
+    def is_final(self, states: frozenset[STATE]) -> bool:
+        return not self.nfa.F.isdisjoint(states)
+
+    def entry(self, states: frozenset[STATE]) -> tuple[bool, dict[str, frozenset[STATE]]]:
+        entry = self.cache.get(states)
+
+        if entry is None:
+            entry = (self.is_final(states), {})
+            self.cache[states] = entry
+            if len(self.cache) > self.max_states:
+                self.cache.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.cache.move_to_end(states)
+
+        return entry
+
+    def accept(self, word: str) -> bool:
+        state = self.q0
+        final, row = self.entry(state)
+        evictions = self.evictions
+
+        for i, symbol in enumerate(word):
+            next_state = row.get(symbol)
+            if next_state is None:
+                next_state = self.move(state, symbol)
+                row[symbol] = next_state
+
+            if not next_state:
+                return False
+
+            state = next_state
+            final, row = self.entry(state)
+
+            # the cache is thrashing: caching costs more than it saves here
+            if self.evictions - evictions > self.thrash_limit:
+                return self.simulate(word[i + 1:], state)
+
+        return final
+
+    def simulate(self, word: str, states: frozenset[STATE] | None = None) -> bool:
+        states = self.q0 if states is None else states
+
+        for symbol in word:
+            states = self.move(states, symbol)
+            if not states:
+                return False
+
+        return self.is_final(states)
@@ -0,0 +1,61 @@
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from .CompiledDFA import CompiledDFA
+from .DFA import DFA
+from .NFA import NFA, EPSILON
+from .Regex import ThompsonBuilder, parse_regex
+
+NO_TAGS: frozenset[int] = frozenset()
+
+@dataclass
+class TaggedDFA[STATE](DFA[STATE]):
+    # final states carry the ids of the patterns they accept
+    tags: dict[STATE, frozenset[int]] = field(default_factory=dict)
+
+    def state_label(self, state: STATE) -> object:
+        return self.tags.get(state, NO_TAGS)
+
+    def quotient(self, new_states: dict[STATE, int], size: int) -> 'TaggedDFA[int]':
+        dfa = super().quotient(new_states, size)
+        tags = {new_states[state]: tag for state, tag in self.tags.items() if state in new_states}
+        return TaggedDFA(S=dfa.S, K=dfa.K, q0=dfa.q0, d=dfa.d, F=dfa.F, tags=tags)
+
+def multi_pattern_nfa(patterns: Iterable[str], char_ranges: bool = True) -> tuple[NFA[int], dict[int, int]]:
+    # one start state with an epsilon edge into every pattern's automaton;
+    # each pattern's accepting state is tagged with the pattern's index
+    builder = ThompsonBuilder(char_ranges)
+    start = builder.new_state()
+    accepting = {}
+
+    for i, pattern in enumerate(patterns):
+        pattern_start, pattern_accept = builder.build(parse_regex(pattern))
+        builder.add(start, EPSILON, pattern_start)
+        accepting[pattern_accept] = i
+
+    nfa = NFA(S=builder.alphabet, K=set(range(builder.count)), q0=start, d=builder.transitions, F=set(accepting))
+    return nfa, accepting
+
+def tagged_subset_construction(nfa: NFA[int], accepting: dict[int, int]) -> TaggedDFA[frozenset[int]]:
+    dfa = nfa.subset_construction()
+    tags = {}
+    for state in dfa.F:
+        tags[state] = frozenset(accepting[s] for s in state if s in accepting)
+    return TaggedDFA(S=dfa.S, K=dfa.K, q0=dfa.q0, d=dfa.d, F=dfa.F, tags=tags)
+
+class MultiPattern:
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = list(patterns)
+        nfa, accepting = multi_pattern_nfa(self.patterns)
+        self.dfa = tagged_subset_construction(nfa, accepting).minimize()
+        self.compiled = self.dfa.compile()
+
+        # tag set per compiled state, the dead state last
+        order = CompiledDFA.state_order(self.dfa)
+        self.state_tags = [self.dfa.tags.get(state, NO_TAGS) for state in order] + [NO_TAGS]
+
+    def match(self, word: str | bytes) -> frozenset[int]:
+        return self.state_tags[self.compiled.run(word) // self.compiled.stride]
+
+    def match_patterns(self, word: str | bytes) -> list[str]:
+        return [self.patterns[i] for i in sorted(self.match(word))]
@@ -1,10 +1,40 @@
+from .CharSet import CharSet
 from .DFA import DFA
+from .LazyDFA import LazyDFA, DEFAULT_MAX_STATES
 
 from dataclasses import dataclass
 from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+import os
 
 EPSILON = ''  # this is how epsilon is represented by the checker in the transition function of NFAs
 
+# a (mask, step) pair for symbols no NFA state moves on
+NO_MOVE = (0, {})
+
+# frontiers smaller than this are expanded in the parent process
+PARALLEL_FRONTIER = 256
+
+def bitset_move(state: int, mask: int, step: dict[int, int]) -> int:
+    active = state & mask
+    next_state = 0
+    while active:
+        low = active & -active
+        next_state |= step[low.bit_length() - 1]
+        active ^= low
+    return next_state
+
+# set in each worker process by init_subset_worker()
+subset_tables: list[tuple[int, dict[int, int]]] | None = None
+
+def init_subset_worker(tables: list[tuple[int, dict[int, int]]]) -> None:
+    global subset_tables
+    subset_tables = tables
+
+def expand_frontier(frontier: list[int], tables: list[tuple[int, dict[int, int]]] | None = None) -> list[tuple[int, ...]]:
+    tables = subset_tables if tables is None else tables
+    return [tuple(bitset_move(state, mask, step) for mask, step in tables) for state in frontier]
+
 @dataclass
 class NFA[STATE]:
     S: set[str]
@@ -28,9 +58,246 @@ class NFA[STATE]:
 
         return set_of_states
 
-    def subset_construction(self) -> DFA[frozenset[STATE]]:
+    def epsilon_closures(self) -> dict[STATE, frozenset[STATE]]:
+        # Tarjan's SCC algorithm on the epsilon graph, run with an explicit stack.
+        # Components are completed sinks first, so a component's closure is its
+        # members plus the (already known) closures of its successors, and every
+        # member shares the same frozenset.
+        graph = {}
+        states = set(self.K) | {self.q0}
+        for (state, symbol), next_states in self.d.items():
+            states.add(state)
+            states |= next_states
+            if symbol == EPSILON:
+                graph[state] = next_states
+
+        closures = {}
+        index = {}
+        low = {}
+        stack = []
+        on_stack = set()
+
+        for root in states:
+            if root in index:
+                continue
+
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(graph.get(root, ())))]
+
+            while work:
+                state, successors = work[-1]
+
+                for next_state in successors:
+                    if next_state not in index:
+                        index[next_state] = low[next_state] = len(index)
+                        stack.append(next_state)
+                        on_stack.add(next_state)
+                        work.append((next_state, iter(graph.get(next_state, ()))))
+                        break
+                    if next_state in on_stack:
+                        low[state] = min(low[state], index[next_state])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[state])
+
+                    if low[state] == index[state]:
+                        members = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            members.append(member)
+                            if member == state:
+                                break
+
+                        closure = set(members)
+                        for member in members:
+                            for next_state in graph.get(member, ()):
+                                if next_state in closures:
+                                    closure |= closures[next_state]
+
+                        closure = frozenset(closure)
+                        for member in members:
+                            closures[member] = closure
+
+        return closures
+
+    def split_ranges(self) -> 'NFA[STATE]':
+        # overlapping interval symbols are replaced by the disjoint pieces
+        # between their boundaries, so each DFA column is one piece
+        if not any(isinstance(symbol, CharSet) for symbol in self.S):
+            return self
+
+        pieces = CharSet.partition(self.S)
+        if all(covering == [symbol] for symbol, covering in pieces.items()):
+            return self
+
+        new_d = {}
+        for (state, symbol), next_states in self.d.items():
+            for piece in pieces.get(symbol, [symbol]):
+                new_d.setdefault((state, piece), set()).update(next_states)
+
+        new_S = {piece for covering in pieces.values() for piece in covering}
+
+        return NFA(S=new_S, K=self.K, q0=self.q0, d=new_d, F=self.F)
+
+    def outgoing(self) -> dict[STATE, dict[str, set[STATE]]]:
+        out = {state: {} for state in self.K | {self.q0}}
+        for (state, symbol), next_states in self.d.items():
+            out.setdefault(state, {}).setdefault(symbol, set()).update(next_states)
+            for next_state in next_states:
+                out.setdefault(next_state, {})
+        return out
+
+    @staticmethod
+    def from_outgoing(S: set[str], q0: STATE, out: dict[STATE, dict[str, set[STATE]]], F: set[STATE]) -> 'NFA[STATE]':
+        d = {(state, symbol): next_states for state, edges in out.items()
+             for symbol, next_states in edges.items() if next_states}
+        return NFA(S=S, K=set(out), q0=q0, d=d, F=F & set(out))
+
+    def remove_epsilons(self) -> 'NFA[STATE]':
+        # a state gets every non-epsilon edge of its epsilon closure and is
+        # final if anything in its closure is
+        closures = self.epsilon_closures()
+        out = self.outgoing()
+
+        new_out = {}
+        for state in out:
+            edges = {}
+            for member in closures[state]:
+                for symbol, next_states in out[member].items():
+                    if symbol != EPSILON:
+                        edges.setdefault(symbol, set()).update(next_states)
+            new_out[state] = edges
+
+        F = {state for state in out if not closures[state].isdisjoint(self.F)}
+        return NFA.from_outgoing(self.S, self.q0, new_out, F)
+
+    def prune(self) -> 'NFA[STATE]':
+        # keeps the states that are reachable from q0 and can reach a final state
+        out = self.outgoing()
+
+        reachable = {self.q0}
+        stack = [self.q0]
+        while stack:
+            for next_states in out[stack.pop()].values():
+                for next_state in next_states:
+                    if next_state not in reachable:
+                        reachable.add(next_state)
+                        stack.append(next_state)
+
+        predecessors = {}
+        for state in reachable:
+            for next_states in out[state].values():
+                for next_state in next_states:
+                    predecessors.setdefault(next_state, set()).add(state)
+
+        live = self.F & reachable
+        stack = list(live)
+        while stack:
+            for state in predecessors.get(stack.pop(), ()):
+                if state not in live:
+                    live.add(state)
+                    stack.append(state)
+
+        keep = live | {self.q0}
+        new_out = {state: {symbol: next_states & keep for symbol, next_states in out[state].items()}
+                   for state in keep}
+        return NFA.from_outgoing(self.S, self.q0, new_out, self.F)
+
+    def merge_equivalent(self) -> 'NFA[STATE]':
+        # states with the same finality and the same outgoing edges accept the
+        # same language. Merging renames edges, which can make more states
+        # identical, so this repeats until nothing changes
+        out = self.outgoing()
+        q0 = self.q0
+        F = set(self.F)
+
+        while True:
+            groups = {}
+            rename = {}
+            for state, edges in out.items():
+                key = (state in F, frozenset((symbol, frozenset(next_states))
+                                             for symbol, next_states in edges.items() if next_states))
+                rename[state] = groups.setdefault(key, state)
+
+            if len(groups) == len(out):
+                return NFA.from_outgoing(self.S, q0, out, F)
+
+            out = {state: {symbol: {rename[next_state] for next_state in next_states}
+                           for symbol, next_states in edges.items()}
+                   for state, edges in out.items() if rename[state] == state}
+            F = {rename[state] for state in F}
+            q0 = rename[q0]
+
+    def reduce_by_simulation(self) -> 'NFA[STATE]':
+        # direct simulation on an epsilon-free NFA: q simulates p if q is final
+        # whenever p is and every edge p -a-> p' has some q -a-> q' where q'
+        # simulates p'. Mutually similar states are merged, and an edge to p'
+        # is dropped when the same source has an edge on the same symbol to a
+        # state that strictly simulates p'
+        out = self.outgoing()
+        if any(EPSILON in edges for edges in out.values()):
+            raise ValueError('simulation reduction needs an epsilon-free NFA')
+
+        simulated_by = {p: {q for q in out if p not in self.F or q in self.F} for p in out}
+        changed = True
+        while changed:
+            changed = False
+            for p, edges in out.items():
+                for q in list(simulated_by[p]):
+                    if q == p:
+                        continue
+                    for symbol, next_states in edges.items():
+                        candidates = out[q].get(symbol, ())
+                        if any(simulated_by[next_state].isdisjoint(candidates) for next_state in next_states):
+                            simulated_by[p].discard(q)
+                            changed = True
+                            break
+
+        rename = {}
+        for p in out:
+            rename[p] = next((q for q in simulated_by[p] if p in simulated_by[q] and rename.get(q) == q), p)
+
+        new_out = {}
+        for state, edges in out.items():
+            if rename[state] != state:
+                continue
+            new_edges = {}
+            for symbol, next_states in edges.items():
+                targets = {rename[next_state] for next_state in next_states}
+                new_edges[symbol] = {t for t in targets
+                                     if not any(u != t and u in simulated_by[t] and t not in simulated_by[u]
+                                                for u in targets)}
+            new_out[state] = new_edges
+
+        return NFA.from_outgoing(self.S, rename[self.q0], new_out, {rename[state] for state in self.F})
+
+    def optimize(self, simulation: bool = False) -> 'NFA[STATE]':
+        # an equivalent epsilon-free NFA with (usually far) fewer states
+        nfa = self.remove_epsilons().prune().merge_equivalent()
+        if simulation:
+            nfa = nfa.reduce_by_simulation().prune()
+        return nfa
+
+    def subset_construction(self, bitset: bool = False,
+                            workers: int | None = None) -> DFA[frozenset[STATE]] | DFA[int]:
+        if workers is not None:
+            return self.parallel_subset_construction(workers, bitset)
+
+        split = self.split_ranges()
+        if split is not self:
+            return split.subset_construction(bitset)
+
+        if bitset:
+            return self.bitset_subset_construction()
+
         alphabet = self.S
-        start_q0 = frozenset(self.epsilon_closure(self.q0))
+        closures = self.epsilon_closures()
+        start_q0 = closures[self.q0]
 
         dfa_states = { start_q0 }
         dfa_transitions = {}
@@ -46,7 +313,7 @@ class NFA[STATE]:
                     next_states |= self.d.get((s, symbol), set())
                 closure = set()
                 for ns in next_states:
-                    closure |= self.epsilon_closure(ns)
+                    closure |= closures[ns]
                 next_closure = frozenset(closure)
 
                 if next_closure not in dfa_states:
@@ -61,6 +328,124 @@ class NFA[STATE]:
 
         return DFA(S=alphabet, K=dfa_states, q0=start_q0, d=dfa_transitions, F=dfa_final_states)
 
+    def bitset_tables(self) -> tuple[list[STATE], dict[STATE, int], dict[str, tuple[int, dict[int, int]]]]:
+        # NFA state i (of the returned order) is bit i of a Python int. Per
+        # symbol: a mask of the NFA states with a transition on it, and for
+        # each of them the closure of everything reachable on that symbol
+        closures = self.epsilon_closures()
+        order = list(closures)
+        index = {state: i for i, state in enumerate(order)}
+
+        def to_bits(states) -> int:
+            bits = 0
+            for state in states:
+                bits |= 1 << index[state]
+            return bits
+
+        closure_bits = {state: to_bits(closure) for state, closure in closures.items()}
+
+        steps = {}
+        for (state, symbol), next_states in self.d.items():
+            if symbol == EPSILON or symbol not in self.S:
+                continue
+            step = 0
+            for next_state in next_states:
+                step |= closure_bits[next_state]
+            steps.setdefault(symbol, {})[index[state]] = step
+
+        moves = {symbol: (sum(1 << i for i in step), step) for symbol, step in steps.items()}
+        return order, closure_bits, moves
+
+    def bitset_subset_construction(self) -> DFA[int]:
+        # a DFA state is the bitset int itself
+        order, closure_bits, moves = self.bitset_tables()
+
+        alphabet = self.S
+        final_mask = sum(1 << i for i, state in enumerate(order) if state in self.F)
+
+        start_q0 = closure_bits[self.q0]
+        dfa_states = { start_q0 }
+        dfa_transitions = {}
+        to_be_processed = [ start_q0 ]
+
+        while to_be_processed:
+            current_state = to_be_processed.pop()
+
+            for symbol in alphabet:
+                next_state = bitset_move(current_state, *moves.get(symbol, NO_MOVE))
+
+                if next_state not in dfa_states:
+                    dfa_states.add(next_state)
+                    to_be_processed.append(next_state)
+
+                dfa_transitions[(current_state, symbol)] = next_state
+
+        dfa_final_states = {state for state in dfa_states if state & final_mask}
+
+        return DFA(S=alphabet, K=dfa_states, q0=start_q0, d=dfa_transitions, F=dfa_final_states)
+
+    def parallel_subset_construction(self, workers: int | None = None,
+                                     bitset: bool = False) -> DFA[frozenset[STATE]] | DFA[int]:
+        # breadth first, one level at a time: the frontier's bitsets are split
+        # into batches that a process pool expands on every symbol, and the
+        # parent deduplicates them through the set of known states. The
+        # result equals subset_construction(bitset) with the same arguments
+        split = self.split_ranges()
+        if split is not self:
+            return split.parallel_subset_construction(workers, bitset)
+
+        order, closure_bits, moves = self.bitset_tables()
+        alphabet = list(self.S)
+        tables = [moves.get(symbol, NO_MOVE) for symbol in alphabet]
+        final_mask = sum(1 << i for i, state in enumerate(order) if state in self.F)
+
+        start_q0 = closure_bits[self.q0]
+        dfa_states = { start_q0 }
+        dfa_transitions = {}
+        frontier = [ start_q0 ]
+
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(workers, initializer=init_subset_worker, initargs=(tables,)) as executor:
+            n_batches = 4 * workers
+
+            while frontier:
+                if len(frontier) < PARALLEL_FRONTIER:
+                    batches = [frontier]
+                    results = [expand_frontier(frontier, tables)]
+                else:
+                    size = -(-len(frontier) // n_batches)
+                    batches = [frontier[i:i + size] for i in range(0, len(frontier), size)]
+                    results = executor.map(expand_frontier, batches)
+
+                next_frontier = []
+                for batch, successors in zip(batches, results):
+                    for current_state, next_states in zip(batch, successors):
+                        for symbol, next_state in zip(alphabet, next_states):
+                            if next_state not in dfa_states:
+                                dfa_states.add(next_state)
+                                next_frontier.append(next_state)
+
+                            dfa_transitions[(current_state, symbol)] = next_state
+                frontier = next_frontier
+
+        dfa_final_states = {state for state in dfa_states if state & final_mask}
+        dfa = DFA(S=self.S, K=dfa_states, q0=start_q0, d=dfa_transitions, F=dfa_final_states)
+        if bitset:
+            return dfa
+
+        def to_set(bits: int) -> frozenset[STATE]:
+            states = []
+            while bits:
+                low = bits & -bits
+                states.append(order[low.bit_length() - 1])
+                bits ^= low
+            return frozenset(states)
+
+        sets = {state: to_set(state) for state in dfa_states}
+        return dfa.remap_states(sets.__getitem__)
+
+    def lazy_dfa(self, max_states: int = DEFAULT_MAX_STATES) -> LazyDFA[STATE]:
+        return LazyDFA(self, max_states=max_states)
 
     def remap_states[OTHER_STATE](self, f: 'Callable[[STATE], OTHER_STATE]') -> 'NFA[OTHER_STATE]':
         new_K = {f(state) for state in self.K}
@@ -0,0 +1,131 @@
+import mmap
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from multiprocessing import shared_memory
+
+from . import BinaryDFA
+from .CompiledDFA import CompiledDFA
+
+DEFAULT_CHUNK_SIZE = 1 << 12
+
+# set in each worker process by attach(); the table is a view into shared memory
+worker_memory: shared_memory.SharedMemory | None = None
+worker_dfa: CompiledDFA | None = None
+
+def attach(name: str) -> None:
+    global worker_memory, worker_dfa
+    worker_memory = shared_memory.SharedMemory(name=name)
+    worker_dfa = BinaryDFA.loads(worker_memory.buf)
+
+def match_chunk(words: list[str | bytes]) -> bytes:
+    # bytes are read as latin-1, like CompiledDFA.run does; one byte per
+    # word keeps the reply small to pickle
+    words = [word.decode('latin-1') if isinstance(word, bytes) else word for word in words]
+    return bytes(worker_dfa.accept_many(words))
+
+def chunk_map(chunk: str | bytes) -> list[int]:
+    return worker_dfa.state_map(chunk)
+
+def file_chunk_map(path: str, start: int, stop: int) -> list[int]:
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)[start:stop]
+            try:
+                return worker_dfa.state_map(view)
+            finally:
+                view.release()
+
+def chunks[T](items: Iterable[T], size: int) -> Iterator[list[T]]:
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+class ParallelMatcher:
+    # the compiled table is serialized once into shared memory; every worker
+    # maps it zero-copy and only the input words and result bytes are pickled
+    def __init__(self, compiled: CompiledDFA, workers: int | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.compiled = compiled
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+
+        data = BinaryDFA.dumps(compiled)
+        self.memory = shared_memory.SharedMemory(create=True, size=len(data))
+        self.memory.buf[:len(data)] = data
+        try:
+            self.executor = ProcessPoolExecutor(self.workers, initializer=attach, initargs=(self.memory.name,))
+        except BaseException:
+            self.memory.close()
+            self.memory.unlink()
+            raise
+
+    def match(self, words: Iterable[str | bytes]) -> Iterator[bool]:
+        # results come back in input order; at most two chunks per worker are
+        # in flight, so arbitrarily long inputs are streamed
+        pending = deque()
+        for chunk in chunks(words, self.chunk_size):
+            pending.append(self.executor.submit(match_chunk, chunk))
+            if len(pending) >= 2 * self.workers:
+                yield from map(bool, pending.popleft().result())
+        while pending:
+            yield from map(bool, pending.popleft().result())
+
+    def accept_many(self, words: Iterable[str | bytes]) -> list[bool]:
+        return list(self.match(words))
+
+    def match_file(self, path: str | os.PathLike, encoding: str | None = 'utf-8') -> Iterator[bool]:
+        # one result per line, without its line terminator; encoding=None
+        # matches the raw bytes
+        if encoding is None:
+            with open(path, 'rb') as f:
+                yield from self.match(line.removesuffix(b'\n').removesuffix(b'\r') for line in f)
+        else:
+            with open(path, 'r', encoding=encoding) as f:
+                yield from self.match(line.removesuffix('\n') for line in f)
+
+    # a single long input: every chunk is run speculatively from all states
+    # (CompiledDFA.state_map) in parallel, then the per-chunk maps are
+    # composed in order starting from q0
+    def compose(self, maps: Iterable[list[int]]) -> int:
+        stride = self.compiled.stride
+        state = self.compiled.q0
+        for state_map in maps:
+            state = state_map[state // stride]
+        return state
+
+    def spans(self, size: int, n_chunks: int | None) -> list[tuple[int, int]]:
+        n_chunks = n_chunks or 4 * self.workers
+        step = max(1, -(-size // n_chunks))
+        return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+    def run(self, text: str | bytes, n_chunks: int | None = None) -> int:
+        parts = [text[start:stop] for start, stop in self.spans(len(text), n_chunks)]
+        return self.compose(self.executor.map(chunk_map, parts))
+
+    def accept(self, text: str | bytes, n_chunks: int | None = None) -> bool:
+        return self.compiled.is_accepting(self.run(text, n_chunks))
+
+    def run_file(self, path: str | os.PathLike, n_chunks: int | None = None) -> int:
+        # workers map the file themselves; only offsets cross process boundaries.
+        # The file is read as raw bytes (latin-1), like CompiledDFA.run on bytes
+        path = os.fspath(path)
+        spans = self.spans(os.path.getsize(path), n_chunks)
+        starts = [start for start, _ in spans]
+        stops = [stop for _, stop in spans]
+        return self.compose(self.executor.map(file_chunk_map, repeat(path), starts, stops))
+
+    def accept_file(self, path: str | os.PathLike, n_chunks: int | None = None) -> bool:
+        return self.compiled.is_accepting(self.run_file(path, n_chunks))
+
+    def close(self) -> None:
+        self.executor.shutdown()
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self) -> 'ParallelMatcher':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
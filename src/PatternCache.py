@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from .DFA import DFA
+from .Regex import parse_regex
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_STATES = 1 << 20
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    states: int
+
+def build_dfa(pattern: str) -> DFA[int]:
+    dfa = parse_regex(pattern).thompson(char_ranges=True).subset_construction(bitset=True).minimize()
+    dfa.compile()
+    return dfa
+
+class PatternCache:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_states: int = DEFAULT_MAX_STATES):
+        self.max_entries = max_entries
+        self.max_states = max_states
+        self.entries: OrderedDict[str, DFA[int]] = OrderedDict()
+        self.states = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, pattern: str) -> DFA[int]:
+        with self.lock:
+            dfa = self.entries.get(pattern)
+            if dfa is not None:
+                self.entries.move_to_end(pattern)
+                self.hits += 1
+                return dfa
+            self.misses += 1
+
+        # built outside the lock: two threads may race on the same pattern,
+        # in which case the first one to insert wins
+        dfa = build_dfa(pattern)
+
+        with self.lock:
+            existing = self.entries.get(pattern)
+            if existing is not None:
+                return existing
+
+            self.entries[pattern] = dfa
+            self.states += len(dfa.K)
+
+            # the newest entry always stays, even if it alone exceeds max_states
+            while len(self.entries) > 1 and (len(self.entries) > self.max_entries or self.states > self.max_states):
+                _, evicted = self.entries.popitem(last=False)
+                self.states -= len(evicted.K)
+                self.evictions += 1
+
+        return dfa
+
+    def invalidate(self, pattern: str | None = None) -> None:
+        with self.lock:
+            if pattern is None:
+                self.entries.clear()
+                self.states = 0
+                return
+
+            dfa = self.entries.pop(pattern, None)
+            if dfa is not None:
+                self.states -= len(dfa.K)
+
+    def stats(self) -> CacheStats:
+        with self.lock:
+            return CacheStats(hits=self.hits, misses=self.misses, evictions=self.evictions,
+                              entries=len(self.entries), states=self.states)
+
+default_cache = PatternCache()
+
+def compile(pattern: str) -> DFA[int]:
+    return default_cache.get(pattern)
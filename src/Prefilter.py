@@ -0,0 +1,259 @@
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from .DFA import DFA
+from .Regex import Regex, Epsilon, Character, CharClass, Union, Concatenation, Plus, QuestionMark
+from .Search import Searcher
+
+# literal sets larger than this are dropped (treated as "anything"); exact
+# sets with a longer string are dropped too, while prefixes, suffixes and
+# required literals are cut to MAX_LITERAL_LENGTH. Only the MAX_REQUIRED
+# longest required literals are kept, so every node costs O(1)
+MAX_LITERALS = 64
+MAX_LITERAL_LENGTH = 16
+MAX_REQUIRED = 4
+
+@dataclass
+class LiteralInfo:
+    # exact: every string the node matches, if that set is small
+    # prefixes / suffixes: every match starts / ends with one of these
+    # ('' means no information); required: literals occurring in every match
+    exact: frozenset[str] | None
+    prefixes: frozenset[str]
+    suffixes: frozenset[str]
+    required: frozenset[str]
+
+NO_LITERAL = frozenset({''})
+
+def bounded(strings: Iterable[str]) -> frozenset[str] | None:
+    strings = frozenset(strings)
+    return strings if len(strings) <= MAX_LITERALS else None
+
+def product(left: frozenset[str], right: frozenset[str]) -> frozenset[str] | None:
+    if len(left) * len(right) > MAX_LITERALS:
+        return None
+    return frozenset(a + b for a in left for b in right)
+
+def short(strings: frozenset[str] | None) -> frozenset[str] | None:
+    if strings is None or any(len(s) > MAX_LITERAL_LENGTH for s in strings):
+        return None
+    return strings
+
+def best(required: Iterable[str]) -> frozenset[str]:
+    # any piece of a required literal is required as well
+    literals = {r[:MAX_LITERAL_LENGTH] for r in required if r}
+    return frozenset(sorted(literals, key=lambda r: (-len(r), r))[:MAX_REQUIRED])
+
+def literal_info(node: Regex, children: list[LiteralInfo]) -> LiteralInfo:
+    if isinstance(node, Epsilon):
+        exact = frozenset({''})
+    elif isinstance(node, Character):
+        exact = frozenset({node.c})
+    elif isinstance(node, CharClass):
+        exact = frozenset(node.charset.chars()) if len(node.charset) <= MAX_LITERALS else None
+    else:
+        exact = None
+
+    prefixes = suffixes = NO_LITERAL
+    required = frozenset()
+
+    if isinstance(node, Union):
+        left, right = children
+        if left.exact is not None and right.exact is not None:
+            exact = bounded(left.exact | right.exact)
+        prefixes = bounded(left.prefixes | right.prefixes) or NO_LITERAL
+        suffixes = bounded(left.suffixes | right.suffixes) or NO_LITERAL
+        required = left.required & right.required
+    elif isinstance(node, Concatenation):
+        left, right = children
+        if left.exact is not None and right.exact is not None:
+            exact = short(product(left.exact, right.exact))
+        if left.exact is not None:
+            prefixes = product(left.exact, right.prefixes) or left.prefixes
+        else:
+            prefixes = left.prefixes
+        if right.exact is not None:
+            suffixes = product(left.suffixes, right.exact) or right.suffixes
+        else:
+            suffixes = right.suffixes
+        required = left.required | right.required
+        # a literal running across the boundary
+        if len(left.suffixes) == 1 and len(right.prefixes) == 1:
+            required = required | product(left.suffixes, right.prefixes)
+    elif isinstance(node, Plus):
+        inner, = children
+        prefixes = inner.prefixes
+        suffixes = inner.suffixes
+        required = inner.required
+    elif isinstance(node, QuestionMark):
+        inner, = children
+        if inner.exact is not None:
+            exact = bounded(inner.exact | {''})
+
+    if exact is not None:
+        prefixes = suffixes = exact
+    prefixes = frozenset(p[:MAX_LITERAL_LENGTH] for p in prefixes)
+    suffixes = frozenset(s[-MAX_LITERAL_LENGTH:] for s in suffixes)
+
+    for literals in (exact, prefixes, suffixes):
+        if literals is not None and len(literals) == 1:
+            required = required | literals
+
+    return LiteralInfo(exact, prefixes, suffixes, best(required))
+
+def analyze(regex: Regex) -> LiteralInfo:
+    # post-order on an explicit stack; nodes are interned, so a subexpression
+    # that occurs several times is analyzed once
+    infos: dict[Regex, LiteralInfo] = {}
+    stack = [regex]
+
+    while stack:
+        node = stack.pop()
+        if node in infos:
+            continue
+
+        pending = [child for child in node.children() if child not in infos]
+        if pending:
+            stack.append(node)
+            stack.extend(pending)
+            continue
+
+        infos[node] = literal_info(node, [infos[child] for child in node.children()])
+
+    return infos[regex]
+
+class AhoCorasick:
+    def __init__(self, words: Iterable[str | bytes]):
+        self.goto: list[dict] = [{}]
+        self.fail: list[int] = [0]
+        self.output: list[int] = [0]  # length of the longest word ending here, 0 if none
+
+        for word in words:
+            node = 0
+            for symbol in word:
+                if symbol not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(0)
+                    self.goto[node][symbol] = len(self.goto) - 1
+                node = self.goto[node][symbol]
+            self.output[node] = max(self.output[node], len(word))
+
+        self.longest = max(self.output)
+
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for symbol, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and symbol not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(symbol, 0)
+                self.output[child] = max(self.output[child], self.output[self.fail[child]])
+
+    def find(self, text: str | bytes, pos: int = 0) -> int:
+        # leftmost start of any word at or after pos, -1 if there is none. Only
+        # the longest word per end is tracked, which starts the earliest there.
+        goto, fail, output = self.goto, self.fail, self.output
+        node = 0
+        best = -1
+
+        for i in range(pos, len(text)):
+            if best >= 0 and i - self.longest >= best:
+                break
+            symbol = text[i]
+            while node and symbol not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(symbol, 0)
+            if output[node]:
+                start = i + 1 - output[node]
+                if best < 0 or start < best:
+                    best = start
+
+        return best
+
+@dataclass
+class Prefilter:
+    prefixes: frozenset[str] | None
+    required: str
+    _cache: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @staticmethod
+    def from_regex(regex: Regex) -> 'Prefilter':
+        info = analyze(regex)
+        prefixes = None if '' in info.prefixes else info.prefixes
+        required = max(info.required, key=len, default='')
+        return Prefilter(prefixes, required)
+
+    def literals(self, text: str | bytes) -> tuple[tuple, str | bytes]:
+        # bytes are matched as latin-1, the same way CompiledDFA reads them
+        if not isinstance(text, (bytes, bytearray)):
+            literals = self._cache.get(str)
+            if literals is None:
+                literals = self._cache[str] = (tuple(sorted(self.prefixes or ())), self.required)
+            return literals
+
+        encoded = self._cache.get(bytes)
+        if encoded is None:
+            def encode(literal: str) -> bytes | None:
+                try:
+                    return literal.encode('latin-1')
+                except UnicodeEncodeError:
+                    return None
+            prefixes = tuple(sorted(p for p in map(encode, self.prefixes or ()) if p is not None))
+            encoded = self._cache[bytes] = (prefixes, encode(self.required))
+        return encoded
+
+    def may_match(self, word: str | bytes) -> bool:
+        prefixes, required = self.literals(word)
+        if required is None or required not in word:
+            return False
+        return self.prefixes is None or word.startswith(prefixes)
+
+    def next_candidate(self, text: str | bytes, pos: int, required_at: int = -1) -> tuple[int, int]:
+        # the first position >= pos where a match may start (-1 if none is
+        # left) and where the required literal next occurs. Passing that back
+        # in as required_at skips searching for it again until pos passes it
+        prefixes, required = self.literals(text)
+        if required is None:
+            return -1, -1
+        if required_at < pos:
+            required_at = text.find(required, pos)
+            if required_at < 0:
+                return -1, -1
+        if self.prefixes is None:
+            return pos, required_at
+        if not prefixes:
+            return -1, required_at
+        return self.next_prefix(text, prefixes, pos), required_at
+
+    def next_prefix(self, text: str | bytes, prefixes: tuple, pos: int) -> int:
+        if len(prefixes) == 1:
+            return text.find(prefixes[0], pos)
+
+        # prefixes sharing a leading literal: find that, then check the rest
+        common = os.path.commonprefix(prefixes)
+        if common:
+            while True:
+                pos = text.find(common, pos)
+                if pos < 0 or text.startswith(prefixes, pos):
+                    return pos
+                pos += 1
+
+        automaton = self._cache.get(prefixes)
+        if automaton is None:
+            automaton = self._cache[prefixes] = AhoCorasick(prefixes)
+        return automaton.find(text, pos)
+
+class PrefilteredDFA:
+    def __init__(self, regex: Regex, dfa: DFA):
+        self.prefilter = Prefilter.from_regex(regex)
+        self.compiled = dfa.compile()
+        self.searcher = Searcher(self.compiled, prefilter=self.prefilter)
+
+    def accept(self, word: str | bytes) -> bool:
+        return self.prefilter.may_match(word) and self.compiled.accept(word)
+
+    def finditer(self, text: str | bytes):
+        return self.searcher.finditer(text)
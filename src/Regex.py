@@ -1,162 +1,365 @@
+import threading
+import weakref
 from curses.ascii import isalnum
 from typing import Any, List
 from .NFA import NFA
+from .CharSet import CharSet
 
 EPSILON = ''
 
+class ThompsonBuilder:
+    # every sub-automaton allocates its states from the same counter and writes
+    # into the same transition table, so nothing is ever copied or renumbered
+    def __init__(self, char_ranges: bool = False):
+        self.char_ranges = char_ranges
+        self.alphabet: set[str | CharSet] = set()
+        self.transitions: dict[tuple[int, str | CharSet], set[int]] = {}
+        self.count = 0
+
+    def new_state(self) -> int:
+        self.count += 1
+        return self.count - 1
+
+    def add(self, state: int, symbol: str | CharSet, next_state: int) -> None:
+        if symbol != EPSILON:
+            self.alphabet.add(symbol)
+        self.transitions.setdefault((state, symbol), set()).add(next_state)
+
+    def build(self, regex: 'Regex') -> tuple[int, int]:
+        # post-order walk on an explicit stack: a node is combined once all of
+        # its children have left their (start, accept) pair on `results`
+        results = []
+        stack = [(regex, False)]
+
+        while stack:
+            node, ready = stack.pop()
+            children = node.children()
+
+            if ready or not children:
+                parts = results[len(results) - len(children):]
+                del results[len(results) - len(children):]
+                results.append(node.build(self, parts))
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(children))
+
+        return results.pop()
+
+    def nfa(self, start: int, accept: int) -> NFA[int]:
+        return NFA(S=self.alphabet, K=set(range(self.count)), q0=start, d=self.transitions, F={accept})
+
 class Regex:
-    def thompson(self) -> NFA[int]:
+    # nodes are immutable and interned: constructing a node whose class and
+    # fields equal those of a live node returns that node. Children are
+    # interned too, so identity (the default == and hash) is structural
+    # equality, and equal subexpressions are shared
+    __slots__ = ('__weakref__',)
+    fields: tuple[str, ...] = ()
+    interned: 'weakref.WeakValueDictionary[tuple, Regex]' = weakref.WeakValueDictionary()
+    interning = threading.Lock()
+
+    def __new__(cls, *args):
+        key = (cls, *args)
+        node = Regex.interned.get(key)
+        if node is None:
+            with Regex.interning:
+                node = Regex.interned.get(key)
+                if node is None:
+                    node = super().__new__(cls)
+                    for name, value in zip(cls.fields, args, strict=True):
+                        object.__setattr__(node, name, value)
+                    Regex.interned[key] = node
+        return node
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f'{type(self).__name__} nodes are immutable')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{type(self).__name__} nodes are immutable')
+
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, name) for name in self.fields)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({", ".join(repr(getattr(self, name)) for name in self.fields)})'
+
+    def simplify(self) -> 'Regex':
+        return simplify(self)
+
+    def thompson(self, char_ranges: bool = False) -> NFA[int]:
+        # with char_ranges, character classes become a single interval edge
+        # instead of one edge per member character
+        builder = ThompsonBuilder(char_ranges)
+        start, accept = builder.build(self)
+        return builder.nfa(start, accept)
+
+    def children(self) -> tuple['Regex', ...]:
+        return ()
+
+    def build(self, builder: ThompsonBuilder, parts: list[tuple[int, int]]) -> tuple[int, int]:
         pass
 
 class Epsilon(Regex):
-    def __init__(self):
-        pass
+    __slots__ = ()
 
-    def thompson(self) -> NFA[int]:
-        start = 0
-        accept = 1
+    def build(self, builder: ThompsonBuilder, parts: list[tuple[int, int]]) -> tuple[int, int]:
+        start = builder.new_state()
+        accept = builder.new_state()
 
-        states = {start, accept}
-        alphabet = set()
+        builder.add(start, EPSILON, accept)
 
-        transition = { (start, EPSILON): frozenset({accept}) }
-
-        return NFA(S=alphabet, K=states, q0=start, d=transition, F={accept})
+        return start, accept
 
 class Character(Regex):
-    def __init__(self, c:str):
-        self.c = c
+    __slots__ = fields = ('c',)
 
-    def thompson(self) -> NFA[int]:
-        start = 0
-        accept = 1
+    def build(self, builder: ThompsonBuilder, parts: list[tuple[int, int]]) -> tuple[int, int]:
+        start = builder.new_state()
+        accept = builder.new_state()
 
-        states = {start, accept}
-        alphabet = {self.c}
+        builder.add(start, self.c, accept)
 
-        transition = { (start, self.c): frozenset({accept}) }
+        return start, accept
 
-        return NFA(S=alphabet, K=states, q0=start, d=transition, F={accept})
+class CharClass(Regex):
+    __slots__ = fields = ('charset',)
 
-class Union(Regex):
-    def __init__(self, r1:Regex, r2:Regex):
-        self.r1 = r1
-        self.r2 = r2
+    def build(self, builder: ThompsonBuilder, parts: list[tuple[int, int]]) -> tuple[int, int]:
+        start = builder.new_state()
+        accept = builder.new_state()
 
-    def thompson(self) -> NFA[int]:
-        nfa1 = self.r1.thompson()
-        nfa2 = self.r2.thompson()
-        
-        nfa1 = nfa1.remap_states(lambda s: s + 1)
-        nfa2 = nfa2.remap_states(lambda s: s + len(nfa1.K) + 1)
+        if builder.char_ranges and len(self.charset) > 1:
+            builder.add(start, self.charset, accept)
+        else:
+            for c in self.charset.chars():
+                builder.add(start, c, accept)
 
-        start = 0
-        accept = max(nfa2.K) + 1
+        return start, accept
 
-        states = {start, accept} | nfa1.K | nfa2.K
-        alphabet = nfa1.S | nfa2.S
+class Union(Regex):
+    __slots__ = fields = ('r1', 'r2')
 
-        transition = {}
-        transition[(start, EPSILON)] = frozenset({nfa1.q0, nfa2.q0})
+    def children(self) -> tuple[Regex, ...]:
+        return (self.r1, self.r2)
 
-        transition.update(nfa1.d)
-        transition.update(nfa2.d)
+    def build(self, builder: ThompsonBuilder, parts: list[tuple[int, int]]) -> tuple[int, int]:
+        (start1, accept1), (start2, accept2) = parts
+        start = builder.new_state()
+        accept = builder.new_state()
 
-        for f in nfa1.F:
-            transition[(f, EPSILON)] = frozenset({accept})
-        for f in nfa2.F:
-            transition[(f, EPSILON)] = frozenset({accept})
+        builder.add(start, EPSILON, start1)
+        builder.add(start, EPSILON, start2)
+        builder.add(accept1, EPSILON, accept)
+        builder.add(accept2, EPSILON, accept)
 
-        return NFA(S=alphabet, K=states, q0=start, d=transition, F={accept})
+        return start, accept
     
 class Concatenation(Regex):
-    def __init__(self, r1:Regex, r2:Regex):
-        self.r1 = r1
-        self.r2 = r2
+    __slots__ = fields = ('r1', 'r2')
 
-    def thompson(self) -> NFA[int]:
-        nfa1 = self.r1.thompson()
-        nfa2 = self.r2.thompson()
+    def children(self) -> tuple[Regex, ...]:
+        return (self.r1, self.r2)
 
-        nfa1 = nfa1.remap_states(lambda s: s + 1)
-        nfa2 = nfa2.remap_states(lambda s: s + len(nfa1.K) + 1)
+    def build(self, builder: ThompsonBuilder, parts: list[tuple[int, int]]) -> tuple[int, int]:
+        (start1, accept1), (start2, accept2) = parts
 
-        start = 0
-        accept = max(nfa2.K) + 1
+        builder.add(accept1, EPSILON, start2)
 
-        states = {start, accept} | nfa1.K | nfa2.K
-        alphabet = nfa1.S | nfa2.S
-
-        transition = {}
-        transition[(start, EPSILON)] =  frozenset({nfa1.q0})
+        return start1, accept2
+    
+class Star(Regex):
+    __slots__ = fields = ('r',)
 
-        for f in nfa1.F:
-            transition[(f, EPSILON)] = frozenset({nfa2.q0})
+    def children(self) -> tuple[Regex, ...]:
+        return (self.r,)
 
-        for f in nfa2.F:
-            transition[(f, EPSILON)] = frozenset({accept})
+    def build(self, builder: ThompsonBuilder, parts: list[tuple[int, int]]) -> tuple[int, int]:
+        (inner_start, inner_accept), = parts
+        start = builder.new_state()
+        accept = builder.new_state()
 
-        transition.update(nfa1.d)
-        transition.update(nfa2.d)
+        builder.add(start, EPSILON, inner_start)
+        builder.add(start, EPSILON, accept)
+        builder.add(inner_accept, EPSILON, inner_start)
+        builder.add(inner_accept, EPSILON, accept)
 
-        return NFA(S=alphabet, K=states, q0=start, d=transition, F={accept})
-    
-class Star(Regex):
-    def __init__(self, r:Regex):
-        self.r = r
+        return start, accept
 
-    def thompson(self):
-        nfa = self.r.thompson()
-        nfa = nfa.remap_states(lambda s: s + 1)
+class Plus(Regex):
+    __slots__ = fields = ('r',)
 
-        start = 0
-        accept = max(nfa.K) + 1
+    def children(self) -> tuple[Regex, ...]:
+        return (self.r,)
 
-        states = {start, accept} | nfa.K
-        alphabet = nfa.S
+    def build(self, builder: ThompsonBuilder, parts: list[tuple[int, int]]) -> tuple[int, int]:
+        # r+ loops back over the single copy of r instead of compiling r r*
+        (inner_start, inner_accept), = parts
 
-        transition = {}
-        transition[(start, EPSILON)] = frozenset({nfa.q0, accept})
+        builder.add(inner_accept, EPSILON, inner_start)
 
-        for f in nfa.F:
-            transition[(f, EPSILON)] = frozenset({nfa.q0, accept})
+        return inner_start, inner_accept
 
-        transition.update(nfa.d)
+class QuestionMark(Regex):
+    __slots__ = fields = ('r',)
 
-        return NFA(S=alphabet, K=states, q0=start, d=transition, F={accept})
+    def children(self) -> tuple[Regex, ...]:
+        return (self.r,)
 
-class Plus(Regex):
-    def __init__(self, r:Regex):
-        self.r = r
+    def build(self, builder: ThompsonBuilder, parts: list[tuple[int, int]]) -> tuple[int, int]:
+        (inner_start, inner_accept), = parts
+        start = builder.new_state()
+        accept = builder.new_state()
 
-    def thompson(self):
-        return Concatenation(self.r, Star(self.r)).thompson()
+        builder.add(start, EPSILON, inner_start)
+        builder.add(start, EPSILON, accept)
+        builder.add(inner_accept, EPSILON, accept)
 
-class QuestionMark(Regex):
-    def __init__(self, r:Regex):
-        self.r = r
+        return start, accept
+    
+def factors(regex: Regex, kind: type[Regex]) -> list[Regex]:
+    # the operands of a chain of Concatenation or Union nodes, left to right
+    found = []
+    stack = [regex]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, kind):
+            stack.append(node.r2)
+            stack.append(node.r1)
+        else:
+            found.append(node)
+    return found
+
+def operands(regex: Regex) -> list[Regex]:
+    # the children of a node, except that a whole chain of Concatenation (or
+    # Union) nodes is seen through from its top node, so passes that treat
+    # chains as one unit visit each chain once rather than once per link
+    if isinstance(regex, (Concatenation, Union)):
+        return factors(regex, type(regex))
+    return list(regex.children())
+
+def concatenate(parts: list[Regex]) -> Regex:
+    parts = [part for part in parts if not isinstance(part, Epsilon)]
+    if not parts:
+        return Epsilon()
+    result = parts[0]
+    for part in parts[1:]:
+        result = Concatenation(result, part)
+    return result
+
+def optional(regex: Regex) -> Regex:
+    if isinstance(regex, (Epsilon, Star, QuestionMark)):
+        return regex
+    if isinstance(regex, Plus):
+        return Star(regex.r)
+    return QuestionMark(regex)
+
+def factor_prefixes(sequences: list[tuple[Regex, ...]], start: int) -> tuple[list[Regex | None], bool, list]:
+    # the pieces of one union level, whose alternatives are sequence[start:].
+    # Alternatives that share a first factor leave a None piece, to be filled
+    # with their common prefix + (the union level of their tails)
+    groups: dict[Regex | None, list[tuple[Regex, ...]]] = {}
+    for sequence in sequences:
+        groups.setdefault(sequence[start] if start < len(sequence) else None, []).append(sequence)
+
+    pieces = []
+    nullable = False
+    factored = []
+    for head, group in groups.items():
+        if head is None:
+            nullable = True
+        elif len(group) == 1:
+            pieces.append(concatenate(list(group[0][start:])))
+        else:
+            common = start + 1
+            while all(len(sequence) > common for sequence in group) and \
+                    all(sequence[common] is group[0][common] for sequence in group):
+                common += 1
+            factored.append((len(pieces), group[0][start:common], group, common))
+            pieces.append(None)
+    return pieces, nullable, factored
+
+def union_of(pieces: list[Regex], nullable: bool) -> Regex:
+    if not pieces:
+        return Epsilon()
+    union = pieces[0]
+    for piece in pieces[1:]:
+        union = Union(union, piece)
+    return optional(union) if nullable else union
+
+def alternate(alternatives: list[Regex]) -> Regex:
+    # (r|r) -> r, and an empty alternative makes the rest optional; the
+    # alternatives that share a first factor are factored: ab|ac -> a(b|c).
+    # Every factored prefix nests another union level, so the levels are
+    # built on an explicit stack, innermost first; a level only records how
+    # far into its sequences it starts, so tails are never copied
+    sequences = {}
+    for alternative in alternatives:
+        sequence = tuple(part for part in factors(alternative, Concatenation) if not isinstance(part, Epsilon))
+        sequences[sequence] = None
+
+    stack = [[*factor_prefixes(list(sequences), 0), None]]
+    while stack:
+        frame = stack[-1]
+        pieces, nullable, factored, parent = frame
+        if factored:
+            index, prefix, group, common = factored.pop()
+            stack.append([*factor_prefixes(group, common), (frame, index, prefix)])
+            continue
+        stack.pop()
 
-    def thompson(self):
-        nfa = self.r.thompson()
+        union = union_of(pieces, nullable)
+        if parent is None:
+            return union
+        parent_frame, index, prefix = parent
+        parent_frame[0][index] = concatenate([*prefix, union])
 
-        nfa = nfa.remap_states(lambda s: s + 1)
+def simplify(regex: Regex) -> Regex:
+    # r** -> r*, (r|r) -> r, ε·r -> r and common prefix factoring in unions.
+    # Nodes are interned, so each distinct subexpression is simplified once,
+    # and each Concatenation / Union chain is rebuilt once from its top node
+    simplified: dict[Regex, Regex] = {}
+    stack = [regex]
 
-        start = 0
-        accept = max(nfa.K) + 1
+    while stack:
+        node = stack.pop()
+        if node in simplified:
+            continue
 
-        states = {start, accept} | nfa.K
-        alphabet = nfa.S
+        children = operands(node)
+        pending = [child for child in children if child not in simplified]
+        if pending:
+            stack.append(node)
+            stack.extend(pending)
+            continue
 
-        transitions = {}
-        transitions[(start, EPSILON)] = frozenset({nfa.q0, accept})
+        parts = [simplified[child] for child in children]
+        if isinstance(node, Union):
+            result = alternate([alternative for part in parts for alternative in factors(part, Union)])
+        elif isinstance(node, Concatenation):
+            result = concatenate([factor for part in parts for factor in factors(part, Concatenation)])
+        elif isinstance(node, Star):
+            inner, = parts
+            if isinstance(inner, Epsilon):
+                result = inner
+            else:
+                result = Star(inner.r if isinstance(inner, (Star, Plus, QuestionMark)) else inner)
+        elif isinstance(node, Plus):
+            inner, = parts
+            if isinstance(inner, (Epsilon, Star, Plus)):
+                result = inner
+            elif isinstance(inner, QuestionMark):
+                result = Star(inner.r)
+            else:
+                result = Plus(inner)
+        elif isinstance(node, QuestionMark):
+            result = optional(*parts)
+        else:
+            result = node
 
-        for f in nfa.F:
-            transitions[(f, EPSILON)] = frozenset({accept})
+        simplified[node] = result
 
-        transitions.update(nfa.d)
+    return simplified[regex]
 
-        return NFA(S=alphabet, K=states, q0=start, d=transitions, F={accept})
-    
 OP_STAR = "*"
 OP_PLUS = "+"
 OP_QUESTION = "?"
@@ -244,6 +447,8 @@ def transform_to_AST(postfix: List[str]) -> Regex:
         if is_atomic(tok):
             if tok.startswith('\\'):
                 stack.append(Character(tok[1]))
+            elif tok.startswith('[') and tok.endswith(']'):
+                stack.append(CharClass(char_class_set(tok[1:-1])))
             else:
                 stack.append(Character(tok))
         elif tok == OP_UNION:
@@ -266,26 +471,26 @@ def transform_to_AST(postfix: List[str]) -> Regex:
         
     return stack.pop()
 
-def expand_char_class(content: str) -> List[str]:
-    chars = []
+def char_class_set(content: str) -> CharSet:
+    ranges = []
     i = 0
 
     while i < len(content):
         if i + 2 < len(content) and content[i + 1] == '-':
-            start = content[i]
-            end = content[i + 2]
-            for c in range(ord(start), ord(end) + 1):
-                chars.append(chr(c))
+            ranges.append((ord(content[i]), ord(content[i + 2])))
             i += 3
         else:
             if content[i] == '\\' and i + 1 < len(content):
-                chars.append(content[i + 1])
+                ranges.append((ord(content[i + 1]), ord(content[i + 1])))
                 i += 2
             else:
-                chars.append(content[i])
+                ranges.append((ord(content[i]), ord(content[i])))
                 i += 1
 
-    return chars
+    return CharSet.from_ranges(ranges)
+
+def expand_char_class(content: str) -> List[str]:
+    return list(char_class_set(content).chars())
 
 def tokenize_regex(regex:str) -> List[str]:
     tokens = []
@@ -309,16 +514,11 @@ def tokenize_regex(regex:str) -> List[str]:
             j = i + 1
             while j < len(regex) and regex[j] != ']':
                 j += 1
+            if j == len(regex):
+                raise ValueError("Unterminated character class in regex")
             
-            content = regex[i + 1:j]
-            char_class = expand_char_class(content)
-
-            tokens.append(PARANTHESIS_OPEN)
-            for ch, literal in enumerate(char_class):
-                if ch > 0:
-                    tokens.append(OP_UNION)
-                tokens.append(literal)
-            tokens.append(PARANTHESIS_CLOSE)
+            # kept as one atomic token, compiled to a single CharClass node
+            tokens.append(regex[i:j + 1])
 
             i = j + 1
             continue
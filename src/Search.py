@@ -0,0 +1,205 @@
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+from .CompiledDFA import CompiledDFA
+
+if TYPE_CHECKING:
+    from .Prefilter import Prefilter
+
+DEFAULT_CACHE_LIMIT = 1 << 14
+
+# a prefilter that skips fewer than PREFILTER_MIN_SKIP characters per jump,
+# averaged over its first PREFILTER_PROBE jumps, costs more than it saves and
+# is dropped for the rest of the scan
+PREFILTER_PROBE = 32
+PREFILTER_MIN_SKIP = 8
+
+class ForwardState:
+    # threads: live DFA states ordered by the position their thread started at,
+    # earliest first; a DFA state reached by two threads keeps the earlier one.
+    # Once some thread has matched (matched), no new threads are started and
+    # every thread that started after the matching one is dropped.
+    __slots__ = ('threads', 'matched', 'accepts', 'next')
+
+    def __init__(self, threads: tuple[int, ...], matched: bool, accepts: bool):
+        self.threads = threads
+        self.matched = matched
+        self.accepts = accepts
+        self.next: dict[int, 'ForwardState'] = {}
+
+class ReverseState:
+    __slots__ = ('states', 'final', 'next')
+
+    def __init__(self, states: frozenset[int], final: bool):
+        self.states = states
+        self.final = final
+        self.next: dict[int, 'ReverseState'] = {}
+
+class Searcher:
+    # unanchored leftmost-longest search: a lazily built forward DFA for
+    # `.*R` finds where the leftmost-longest match ends, then a lazily built
+    # DFA for the reversed language walks back from there to its start.
+    # With a prefilter, stretches where no thread is alive are skipped up to
+    # the next position where a match can start. A scan stops once every
+    # thread is dead, so iteration is linear unless a pattern keeps a thread
+    # alive without matching: for `a|a*c` on 'aaa...' every match of 'a'
+    # scans on to the end of the text, which is inherent to leftmost-longest.
+    def __init__(self, compiled: CompiledDFA, cache_limit: int = DEFAULT_CACHE_LIMIT,
+                 prefilter: 'Prefilter | None' = None):
+        self.compiled = compiled
+        self.cache_limit = cache_limit
+        self.prefilter = prefilter
+
+        table = compiled.table
+        stride = compiled.stride
+        self.reverse_edges: dict[tuple[int, int], list[int]] = {}
+        for offset in range(0, len(table), stride):
+            if offset == compiled.dead:
+                continue
+            for cls in range(stride):
+                next_offset = table[offset + cls]
+                if next_offset != compiled.dead:
+                    self.reverse_edges.setdefault((next_offset, cls), []).append(offset)
+
+        self.final_states = frozenset(offset for offset in range(0, len(table), stride)
+                                      if compiled.accepting[offset // stride])
+
+        self.forward_states: dict[tuple[tuple[int, ...], bool], ForwardState] = {}
+        self.reverse_states: dict[frozenset[int], ReverseState] = {}
+
+    def forward_state(self, threads: list[int], matched: bool) -> ForwardState:
+        accepting = self.compiled.accepting
+        stride = self.compiled.stride
+
+        accepts = False
+        for k, offset in enumerate(threads):
+            if accepting[offset // stride]:
+                threads = threads[:k + 1]
+                matched = accepts = True
+                break
+
+        key = (tuple(threads), matched)
+        state = self.forward_states.get(key)
+        if state is None:
+            if len(self.forward_states) >= self.cache_limit:
+                self.forward_states.clear()
+            state = ForwardState(key[0], matched, accepts)
+            self.forward_states[key] = state
+        return state
+
+    def forward_step(self, state: ForwardState, cls: int) -> ForwardState:
+        table = self.compiled.table
+        dead = self.compiled.dead
+
+        threads = []
+        seen = set()
+        for offset in state.threads:
+            next_offset = table[offset + cls]
+            if next_offset != dead and next_offset not in seen:
+                seen.add(next_offset)
+                threads.append(next_offset)
+
+        if not state.matched and self.compiled.q0 not in seen:
+            threads.append(self.compiled.q0)
+
+        next_state = self.forward_state(threads, state.matched)
+        state.next[cls] = next_state
+        return next_state
+
+    def reverse_state(self, states: frozenset[int]) -> ReverseState:
+        state = self.reverse_states.get(states)
+        if state is None:
+            if len(self.reverse_states) >= self.cache_limit:
+                self.reverse_states.clear()
+            state = ReverseState(states, self.compiled.q0 in states)
+            self.reverse_states[states] = state
+        return state
+
+    def reverse_step(self, state: ReverseState, cls: int) -> ReverseState:
+        states = set()
+        for offset in state.states:
+            states.update(self.reverse_edges.get((offset, cls), ()))
+
+        next_state = self.reverse_state(frozenset(states))
+        state.next[cls] = next_state
+        return next_state
+
+    def classifier(self, text: str | bytes):
+        if isinstance(text, (bytes, bytearray, memoryview)):
+            return self.compiled.byte_classes.__getitem__
+        return self.compiled.classify
+
+    def match_end(self, text: str | bytes, pos: int) -> int | None:
+        prefilter = self.prefilter if isinstance(text, (str, bytes, bytearray)) else None
+        required_at = -1
+        if prefilter is not None:
+            pos, required_at = prefilter.next_candidate(text, pos)
+            if pos < 0:
+                return None
+
+        classify = self.classifier(text)
+        idle = state = self.forward_state([self.compiled.q0], False)
+        end = pos if state.accepts else None
+
+        jumps = skipped = 0
+        i = pos
+        while i < len(text):
+            if state is idle and prefilter is not None and i > pos:
+                candidate, required_at = prefilter.next_candidate(text, i, required_at)
+                if candidate < 0:
+                    break
+                jumps += 1
+                skipped += candidate - i
+                i = candidate
+                if jumps == PREFILTER_PROBE and skipped < PREFILTER_PROBE * PREFILTER_MIN_SKIP:
+                    prefilter = None
+
+            cls = classify(text[i])
+            next_state = state.next.get(cls)
+            state = next_state if next_state is not None else self.forward_step(state, cls)
+            i += 1
+
+            if state.accepts:
+                end = i
+            if not state.threads:
+                break
+
+        return end
+
+    def match_start(self, text: str | bytes, pos: int, end: int) -> int:
+        # a match of the reversed language read backwards from `end`; the
+        # last (leftmost) position where it accepts is the match start
+        classify = self.classifier(text)
+        state = self.reverse_state(self.final_states)
+        start = end
+
+        for i in range(end - 1, pos - 1, -1):
+            cls = classify(text[i])
+            next_state = state.next.get(cls)
+            state = next_state if next_state is not None else self.reverse_step(state, cls)
+
+            if not state.states:
+                break
+            if state.final:
+                start = i
+
+        return start
+
+    def search(self, text: str | bytes, pos: int = 0) -> tuple[int, int] | None:
+        end = self.match_end(text, pos)
+        if end is None:
+            return None
+        return self.match_start(text, pos, end), end
+
+    def finditer(self, text: str | bytes, pos: int = 0) -> Iterator[tuple[int, int]]:
+        while pos <= len(text):
+            span = self.search(text, pos)
+            if span is None:
+                return
+            yield span
+
+            start, end = span
+            pos = end if end > start else end + 1
+
+def finditer(dfa, text: str | bytes) -> Iterator[tuple[int, int]]:
+    return Searcher(dfa.compile()).finditer(text)
@@ -0,0 +1,46 @@
+import codecs
+from typing import BinaryIO
+
+from .CompiledDFA import CompiledDFA
+
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+class StreamMatcher:
+    def __init__(self, compiled: CompiledDFA):
+        self.compiled = compiled
+        self.offset = compiled.q0
+
+    @property
+    def state(self) -> int:
+        return self.offset // self.compiled.stride
+
+    def reset(self) -> None:
+        self.offset = self.compiled.q0
+
+    def feed(self, chunk: str | bytes) -> 'StreamMatcher':
+        # bytes are read as latin-1 code points, one symbol per byte
+        self.offset = self.compiled.run(chunk, self.offset)
+        return self
+
+    def is_accepting(self) -> bool:
+        return self.compiled.is_accepting(self.offset)
+
+    def is_dead(self) -> bool:
+        return self.offset == self.compiled.dead
+
+    def feed_file(self, f: BinaryIO, buffer_size: int = DEFAULT_BUFFER_SIZE, encoding: str | None = None) -> bool:
+        # encoding=None reads raw bytes (latin-1); otherwise the stream is
+        # decoded incrementally, so a character split across reads is fine
+        buffer = bytearray(buffer_size)
+        view = memoryview(buffer)
+        decoder = codecs.getincrementaldecoder(encoding)() if encoding is not None else None
+
+        while not self.is_dead():
+            n = f.readinto(buffer)
+            if not n:
+                if decoder is not None:
+                    self.feed(decoder.decode(b'', final=True))
+                break
+            self.feed(view[:n] if decoder is None else decoder.decode(view[:n]))
+
+        return self.is_accepting()
@@ -0,0 +1,79 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src import BinaryDFA
+from src.BinaryDFA import DiskCache
+from src.CompiledDFA import np
+from src.Regex import parse_regex
+
+
+WORDS = ['', 'ab', 'abcd', 'cdd', 'efg', 'abefg', 'bbefg', 'x', 'é']
+
+
+class BinaryDFATests(unittest.TestCase):
+
+    def test_roundtrip(self):
+        dfa = parse_regex('(ab | cd+ | b*)? efg').thompson().subset_construction().minimize()
+        compiled = dfa.compile()
+        loaded = BinaryDFA.loads(BinaryDFA.dumps(compiled))
+        self.assertEqual(loaded.classes, compiled.classes)
+        self.assertEqual(list(loaded.table), list(compiled.table))
+        for word in WORDS:
+            self.assertEqual(loaded.accept(word), compiled.accept(word), word)
+
+    def test_mmap_file(self):
+        compiled = parse_regex('[a-z]+é?').thompson().subset_construction().minimize().compile()
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'pattern.dfa'
+            BinaryDFA.dump(compiled, path)
+            loaded = BinaryDFA.load(path)
+            self.assertIsInstance(loaded.table, memoryview)
+            self.assertTrue(loaded.accept('abcé'))
+            self.assertFalse(loaded.accept('abcéé'))
+
+    def test_bad_header(self):
+        with self.assertRaises(ValueError):
+            BinaryDFA.loads(b'\0' * 64)
+
+    def test_disk_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = DiskCache(directory)
+            built = cache.get('c(a | b)+')
+            self.assertTrue(cache.path('c(a | b)+').exists())
+            mapped = cache.get('c(a | b)+')
+            self.assertIsInstance(mapped.table, memoryview)
+            self.assertEqual(list(mapped.table), list(built.table))
+            self.assertNotEqual(cache.path('a'), cache.path('b'))
+            cache.invalidate()
+            self.assertFalse(cache.path('c(a | b)+').exists())
+
+    def test_disk_cache_rebuilds_corrupt_entry(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = DiskCache(directory)
+            path = cache.path('c(a | b)+')
+            data = BinaryDFA.dumps(cache.get('c(a | b)+'))
+            for corrupt in [b'', data[:10], data[:40], data[:-4], b'x' * len(data)]:
+                path.write_bytes(corrupt)
+                compiled = cache.get('c(a | b)+')
+                self.assertTrue(compiled.accept('cab'))
+                self.assertFalse(compiled.accept('c'))
+                self.assertEqual(path.read_bytes(), data)
+
+    def test_roundtrip_char_ranges(self):
+        dfa = parse_regex('[Ѐ-ӿ]+x[a-z]*').thompson(char_ranges=True).subset_construction().minimize()
+        compiled = dfa.compile()
+        loaded = BinaryDFA.loads(BinaryDFA.dumps(compiled))
+        for word in ['Жx', 'Жxabc', 'x', 'ЖxЖ', 'Ж']:
+            self.assertEqual(loaded.accept(word), compiled.accept(word), word)
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_accept_many_reads_table_in_place(self):
+        compiled = parse_regex('(ab | cd+ | b*)? efg').thompson().subset_construction().minimize().compile()
+        data = bytearray(BinaryDFA.dumps(compiled))
+        loaded = BinaryDFA.loads(data)
+        self.assertEqual(list(loaded.accept_many(WORDS)), [compiled.accept(word) for word in WORDS])
+
+        transitions, _, accepting = loaded.batch_tables()
+        self.assertTrue(np.shares_memory(transitions, np.frombuffer(data, dtype=np.uint8)))
+        self.assertTrue(np.shares_memory(accepting, np.frombuffer(data, dtype=np.uint8)))
@@ -0,0 +1,68 @@
+import itertools
+import unittest
+
+from src.Derivatives import Terms, derivative_dfa
+from src.Regex import parse_regex
+
+
+REGEXES = ['(a|b)*a(a|b)(a|b)', 'ab+c?', '(ab | cd+ | b*)? efg', 'a(b|c)*d|e', '[a-c]+x[0-9]?', 'c*',
+           '(a*b*)*c', 'a**', '(a|a)b', '((a|b)(a|b))*']
+
+
+def words(alphabet, max_length):
+    for length in range(max_length + 1):
+        for word in itertools.product(sorted(alphabet), repeat=length):
+            yield ''.join(word)
+
+
+class DerivativeTests(unittest.TestCase):
+
+    def test_matches_thompson(self):
+        for regex in REGEXES:
+            ast = parse_regex(regex)
+            expected = ast.thompson().subset_construction().minimize()
+            for char_ranges in (False, True):
+                dfa = derivative_dfa(ast, char_ranges=char_ranges)
+                if not char_ranges:
+                    self.assertEqual(dfa.S, expected.S, regex)
+                self.assertEqual(len(dfa.minimize().K), len(expected.K), regex)
+                for word in words({'a', 'b', 'c', 'x', '1'}, 5):
+                    self.assertEqual(dfa.accept(word), expected.accept(word), f'{regex!r} on {word!r}')
+
+    def test_hash_consing(self):
+        terms = Terms()
+        self.assertIs(terms.from_regex(parse_regex('(a|b)c')), terms.from_regex(parse_regex('(b|a)c')))
+        self.assertIs(terms.from_regex(parse_regex('a**')), terms.from_regex(parse_regex('a*')))
+        self.assertIs(terms.from_regex(parse_regex('(a|a)')), terms.from_regex(parse_regex('a')))
+        a = terms.from_regex(parse_regex('a'))
+        self.assertIs(terms.cat(terms.eps, a), a)
+        self.assertIs(terms.union(a, terms.empty), a)
+
+    def test_near_minimal(self):
+        # the derivatives of this pattern are already pairwise inequivalent
+        ast = parse_regex('(a|b)*a(a|b)(a|b)')
+        dfa = derivative_dfa(ast)
+        self.assertLessEqual(len(dfa.K), len(ast.thompson().subset_construction().K))
+        self.assertEqual(len(dfa.K), len(dfa.minimize().K))
+
+    def test_long_concatenation(self):
+        # a left-leaning chain of thousands of Concatenation nodes, as the parser builds it
+        dfa = derivative_dfa(parse_regex('ab' * 2500))
+        self.assertEqual(len(dfa.K), 5002)
+        self.assertTrue(dfa.accept('ab' * 2500))
+        self.assertFalse(dfa.accept('ab' * 2499))
+
+        terms = Terms()
+        chain = terms.from_regex(parse_regex('abc'))
+        self.assertIs(terms.cat(chain, chain), terms.from_regex(parse_regex('abcabc')))
+
+    def test_long_nullable_concatenation(self):
+        # every operand is nullable, so a derivative reaches the whole chain
+        terms = Terms()
+        term = terms.from_regex(parse_regex('a?' * 1500))
+        self.assertIs(terms.derive(term, 'b'), terms.empty)
+        self.assertTrue(terms.derive(term, 'a').nullable)
+
+        dfa = derivative_dfa(parse_regex('a*' * 1200 + 'b'))
+        self.assertTrue(dfa.accept('aaab'))
+        self.assertFalse(dfa.accept('aaa'))
@@ -0,0 +1,178 @@
+import io
+import itertools
+import random
+import unittest
+
+from src.DFA import DFA
+from src.Regex import parse_regex
+
+
+REGEXES = [
+    'a',
+    'ab | cd',
+    '(a | b)*',
+    '(ab | cd)*',
+    'c(a | b)+',
+    '(ab | cd+ | b*)? efg',
+    '(a|(bb*a))(a|(bb*a))*',
+    '(a|b)*c(a|b)*c(a|b)*',
+    'a(b|c)(d|e)|abb|abc',
+    '[0-9]+((\\+|-)[0-9]+)*',
+]
+
+
+def words(alphabet, max_length):
+    for length in range(max_length + 1):
+        for word in itertools.product(sorted(alphabet), repeat=length):
+            yield ''.join(word)
+
+
+def walk(dfa: DFA, word: str) -> bool:
+    state = dfa.q0
+    for symbol in word:
+        state = dfa.d.get((state, symbol))
+        if state is None:
+            return False
+    return state in dfa.F
+
+
+class DFATests(unittest.TestCase):
+
+    def random_dfa(self, n: int, alphabet: set[str], seed: int) -> DFA[int]:
+        rng = random.Random(seed)
+        d = {}
+        for state, symbol in itertools.product(range(n), sorted(alphabet)):
+            d[(state, symbol)] = rng.randrange(n)
+        F = {state for state in range(n) if rng.random() < 0.3}
+        return DFA(S=alphabet, K=set(range(n)), q0=0, d=d, F=F)
+
+    def test_hopcroft_matches_moore(self):
+        for regex in REGEXES:
+            dfa = parse_regex(regex).thompson().subset_construction()
+            hopcroft = dfa.minimize()
+            moore = dfa.minimize(method='moore')
+            self.assertEqual(len(hopcroft.K), len(moore.K), regex)
+
+    def test_hopcroft_random(self):
+        for seed in range(20):
+            dfa = self.random_dfa(40, {'a', 'b', 'c'}, seed)
+            hopcroft = dfa.minimize()
+            moore = dfa.minimize(method='moore')
+            self.assertEqual(len(hopcroft.K), len(moore.K))
+
+    def test_hopcroft_partial_transitions(self):
+        # 0 -a-> 1 -a-> 2, 3 -a-> 4, nothing else defined
+        dfa = DFA(S={'a', 'b'}, K={0, 1, 2, 3, 4}, q0=0,
+                  d={(0, 'a'): 1, (1, 'a'): 2, (3, 'a'): 4}, F={2})
+        minimal = dfa.minimize()
+        # 3 and 4 never reach a final state, so both collapse with the implicit sink
+        self.assertEqual(len(minimal.K), 4)
+
+    def test_unknown_method(self):
+        dfa = self.random_dfa(3, {'a'}, 0)
+        with self.assertRaises(ValueError):
+            dfa.minimize(method='brzozowski')
+
+    def test_compiled_accept(self):
+        for regex in REGEXES:
+            dfa = parse_regex(regex).thompson().subset_construction().minimize()
+            alphabet = dfa.S | {'x'}
+            for word in words(alphabet, 4):
+                self.assertEqual(dfa.accept(word), walk(dfa, word), f'{regex!r} on {word!r}')
+
+    def test_compiled_accept_bytes(self):
+        dfa = parse_regex('[0-9]+((\\+|-)[0-9]+)*').thompson().subset_construction().minimize()
+        compiled = dfa.compile()
+        self.assertTrue(compiled.accept(b'12+3-45'))
+        self.assertFalse(compiled.accept(b'12+'))
+        self.assertFalse(compiled.accept(b'12\xff3'))
+
+    def test_compile_drops_unreachable(self):
+        dfa = DFA(S={'a'}, K={0, 1, 2}, q0=0, d={(0, 'a'): 1, (1, 'a'): 0, (2, 'a'): 2}, F={1})
+        compiled = dfa.compile()
+        # two reachable states plus the dead state
+        self.assertEqual(compiled.n_states, 3)
+        self.assertTrue(dfa.accept('aaa'))
+        self.assertFalse(dfa.accept('aa'))
+
+    def test_stream_matcher(self):
+        dfa = parse_regex('(ab | cd)*').thompson().subset_construction().minimize()
+        matcher = dfa.matcher()
+        self.assertTrue(matcher.is_accepting())
+        matcher.feed('a')
+        self.assertFalse(matcher.is_accepting())
+        matcher.feed(b'bc').feed('d')
+        self.assertTrue(matcher.is_accepting())
+        matcher.feed('x')
+        self.assertTrue(matcher.is_dead())
+        matcher.reset()
+        self.assertEqual(matcher.state, dfa.compile().q0)
+
+    def test_stream_matcher_file(self):
+        dfa = parse_regex('(ab | cd)*').thompson().subset_construction().minimize()
+        self.assertTrue(dfa.matcher().feed_file(io.BytesIO(b'abcd' * 1000), buffer_size=7))
+        self.assertFalse(dfa.matcher().feed_file(io.BytesIO(b'abcd' * 1000 + b'a'), buffer_size=7))
+        self.assertFalse(dfa.matcher().feed_file(io.BytesIO(b'ax' + b'abcd' * 1000), buffer_size=3))
+
+    def test_stream_matcher_file_dies_inside_alphabet(self):
+        class Reader(io.BytesIO):
+            reads = 0
+
+            def readinto(self, buffer):
+                Reader.reads += 1
+                return super().readinto(buffer)
+
+        # 'aa' only uses symbols of the pattern, so the stream dies in the compiled empty-set sink
+        dfa = parse_regex('(ab | cd)*').thompson().subset_construction().minimize()
+        matcher = dfa.matcher()
+        self.assertFalse(matcher.feed_file(Reader(b'aa' + b'abcd' * 1000), buffer_size=4))
+        self.assertTrue(matcher.is_dead())
+        self.assertEqual(Reader.reads, 1)
+
+    def test_stream_matcher_file_encoding(self):
+        dfa = parse_regex('(é | ab)+').thompson().subset_construction().minimize()
+        data = 'éabé'.encode('utf-8') * 100
+        # buffer_size=3 splits the two bytes of some 'é' across reads
+        self.assertTrue(dfa.matcher().feed_file(io.BytesIO(data), buffer_size=3, encoding='utf-8'))
+        self.assertFalse(dfa.matcher().feed_file(io.BytesIO(data), buffer_size=3))
+
+    def test_accept_many(self):
+        for regex in REGEXES:
+            dfa = parse_regex(regex).thompson().subset_construction().minimize()
+            batch = list(words(dfa.S | {'x'}, 3)) + ['é', 'ab' * 20]
+            expected = [walk(dfa, word) for word in batch]
+            self.assertEqual(list(dfa.accept_many(batch)), expected, regex)
+            self.assertEqual(list(dfa.compile().accept_many(batch, batch_size=5)), expected, regex)
+
+    def test_accept_many_empty(self):
+        dfa = parse_regex('a*').thompson().subset_construction().minimize()
+        self.assertEqual(list(dfa.accept_many([])), [])
+        self.assertEqual(list(dfa.accept_many(['', ''])), [True, True])
+
+    def test_accept_many_lone_surrogate(self):
+        dfa = parse_regex('a[b-z]*').thompson().subset_construction().minimize()
+        batch = ['a\ud800', '\udfff', 'ab', 'a']
+        expected = [dfa.accept(word) for word in batch]
+        self.assertEqual(expected, [False, False, True, True])
+        self.assertEqual(list(dfa.accept_many(batch)), expected)
+
+    def test_accept_many_long_word(self):
+        # longer than MAX_BATCH_WIDTH: run on its own instead of widening the batch matrix
+        dfa = parse_regex('(ab)*').thompson().subset_construction().minimize()
+        batch = ['ab', 'ab' * 100000, 'a', 'ab' * 100000 + 'a', ''] * 3
+        expected = [dfa.accept(word) for word in batch]
+        self.assertEqual(expected[:5], [True, True, False, False, True])
+        self.assertEqual(list(dfa.accept_many(batch)), expected)
+        self.assertEqual(list(dfa.compile().accept_many(batch, batch_size=2)), expected)
+
+    def test_alphabet_compression(self):
+        dfa = parse_regex('[a-z0-9]+@[a-z]+').thompson().subset_construction().minimize()
+        compiled = dfa.compile()
+        # [a-z], [0-9] and '@' are the only distinct columns, plus the unknown-symbol column
+        self.assertEqual(compiled.stride, 4)
+        self.assertEqual(len(compiled.classes), 37)
+        self.assertEqual(compiled.classes['a'], compiled.classes['z'])
+        self.assertNotEqual(compiled.classes['a'], compiled.classes['0'])
+        for word, expected in [('ab1@cd', True), ('9@x', True), ('@x', False), ('a@1', False), ('A@b', False)]:
+            self.assertEqual(dfa.accept(word), expected, word)
+            self.assertEqual(compiled.accept(word.encode()), expected, word)
@@ -0,0 +1,78 @@
+import glob
+import io
+import unittest
+
+from src.DFA import DFA
+from src.DFAFile import escape, iter_dfa, read_dfa, unescape, write_dfa
+from src.Regex import parse_regex
+
+
+class DFAFileTests(unittest.TestCase):
+
+    def test_read_reference_files(self):
+        for file_name in glob.glob('./tests_1/*.txt') + glob.glob('./tests_2/*.txt'):
+            dfa = read_dfa(file_name)
+            self.assertIn(dfa.q0, dfa.K, file_name)
+            self.assertTrue(dfa.F <= dfa.K, file_name)
+            for (state, symbol), next_state in dfa.d.items():
+                self.assertIn(symbol, dfa.S, file_name)
+                self.assertIn(next_state, dfa.K, file_name)
+
+    def test_reference_escapes(self):
+        self.assertIn(' ', read_dfa('./tests_2/2.txt').S)
+        self.assertIn('\n', read_dfa('./tests_2/3.txt').S)
+
+    def test_reference_behaviour(self):
+        dfa = read_dfa('./tests_2/3.txt')
+        expected = parse_regex('(\n|[a-z])*').thompson().subset_construction()
+        for word in ['', 'abc', 'a\nb', 'A', 'ab1', '\n\n']:
+            self.assertEqual(dfa.accept(word), expected.accept(word), repr(word))
+
+    def test_roundtrip_special_symbols(self):
+        symbols = {':', '>', '\\', '#', ' ', '\n', '\t', 'é', '\x00'}
+        d = {(0, symbol): 1 for symbol in symbols}
+        dfa = DFA(S=symbols, K={0, 1}, q0=0, d=d, F={1})
+
+        buffer = io.StringIO()
+        write_dfa(dfa, buffer)
+        buffer.seek(0)
+        loaded = read_dfa(buffer, buffer_size=7)
+
+        self.assertEqual(loaded.S, symbols)
+        self.assertEqual(loaded.q0, '0')
+        self.assertEqual(loaded.F, {'1'})
+        self.assertEqual(loaded.d, {('0', symbol): '1' for symbol in symbols})
+
+    def test_escape_roundtrip(self):
+        for text in ['abc', ':>', '\\', '#states', 'a b', '\u2028', '\U0001F600']:
+            self.assertEqual(unescape(escape(text)), text)
+            self.assertNotIn(':', escape(text))
+            self.assertNotIn('>', escape(text))
+
+    def test_generator(self):
+        records = list(iter_dfa(io.StringIO('#states\n0\n#initial\n0\n#accepting\n#alphabet\n:\n#transitions\n0::>0\n')))
+        self.assertEqual(records, [('#states', '0'), ('#initial', '0'), ('#alphabet', ':'),
+                                   ('#transitions', ('0', ':', '0'))])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            read_dfa(io.StringIO('#initial\n0\n#states\n0\n'))
+        with self.assertRaises(ValueError):
+            read_dfa(io.StringIO('0\n'))
+        for symbol in ['[-]', '[-a]', '[a-]', '[\\xzz]']:
+            with self.assertRaisesRegex(ValueError, 'line 7:'):
+                read_dfa(io.StringIO(f'#states\n0\n#initial\n0\n#accepting\n#alphabet\n{symbol}\n#transitions\n'))
+
+    def test_blank_alphabet_line(self):
+        dfa = read_dfa(io.StringIO('#states\n0\n#initial\n0\n#accepting\n0\n#alphabet\na\n\nb\n#transitions\n0:a>0\n'))
+        self.assertEqual(dfa.S, {'a', 'b'})
+
+    def test_roundtrip_char_ranges(self):
+        dfa = parse_regex('[a-z\\-]+:[Ѐ-ӿ]').thompson(char_ranges=True).subset_construction().minimize()
+        buffer = io.StringIO()
+        write_dfa(dfa, buffer)
+        buffer.seek(0)
+        loaded = read_dfa(buffer)
+        self.assertEqual(loaded.S, dfa.S)
+        for word in ['ab-c:Ж', 'a:Ж', ':Ж', 'ab:x', 'a-:Ѐ']:
+            self.assertEqual(loaded.accept(word), dfa.accept(word), word)
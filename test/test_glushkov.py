@@ -0,0 +1,79 @@
+import itertools
+import random
+import unittest
+
+from src.Glushkov import BitParallelMatcher, Glushkov, followpos_dfa
+from src.Regex import parse_regex
+
+
+REGEXES = ['(a|b)*a(a|b)(a|b)', 'ab+c?', '(ab | cd+ | b*)? efg', 'a(b|c)*d|e', '[a-c]+x[0-9]?', 'c*', '(a*b*)*c']
+
+
+def words(alphabet, max_length):
+    for length in range(max_length + 1):
+        for word in itertools.product(sorted(alphabet), repeat=length):
+            yield ''.join(word)
+
+
+class GlushkovTests(unittest.TestCase):
+
+    def test_position_automaton(self):
+        glushkov = Glushkov.from_regex(parse_regex('ab*c'))
+        self.assertEqual(len(glushkov.positions), 3)
+        self.assertEqual(glushkov.first, 0b001)
+        self.assertEqual(glushkov.last, 0b100)
+        self.assertEqual(glushkov.follow, [0b110, 0b110, 0])
+
+        nfa = glushkov.nfa()
+        self.assertFalse(any(symbol == '' for _, symbol in nfa.d))
+        self.assertEqual(len(nfa.K), 4)
+
+    def test_matches_thompson(self):
+        for regex in REGEXES:
+            ast = parse_regex(regex)
+            dfa = ast.thompson().subset_construction()
+            glushkov_dfa = Glushkov.from_regex(ast).nfa().subset_construction()
+            matcher = BitParallelMatcher.from_regex(ast)
+            for word in words({'a', 'b', 'c', 'x', '1'}, 5):
+                expected = dfa.accept(word)
+                self.assertEqual(matcher.accept(word), expected, f'{regex!r} on {word!r}')
+                self.assertEqual(glushkov_dfa.accept(word), expected, f'{regex!r} on {word!r}')
+
+    def test_contains(self):
+        rng = random.Random(0)
+        for regex in REGEXES:
+            ast = parse_regex(regex)
+            dfa = ast.thompson().subset_construction()
+            matcher = BitParallelMatcher.from_regex(ast)
+            for _ in range(50):
+                text = ''.join(rng.choice('abcdx1') for _ in range(rng.randrange(8)))
+                expected = any(dfa.accept(text[i:j]) for i in range(len(text) + 1) for j in range(i, len(text) + 1))
+                self.assertEqual(matcher.contains(text), expected, f'{regex!r} in {text!r}')
+
+    def test_wide_pattern(self):
+        # irregular follow edges spread over many chunks
+        regex = ('(' + '|'.join(f'{c}x' for c in 'abcdefghijklmnopqrstuvw') + ')*q') * 3
+        ast = parse_regex(regex)
+        matcher = BitParallelMatcher.from_regex(ast)
+        self.assertGreater(len(matcher.glushkov.positions), 64)
+        dfa = ast.thompson().subset_construction()
+        rng = random.Random(1)
+        for _ in range(200):
+            word = ''.join(rng.choice(['ax', 'bx', 'wx', 'q', 'x']) for _ in range(rng.randrange(10)))
+            self.assertEqual(matcher.accept(word), dfa.accept(word), word)
+
+    def test_position_limit(self):
+        with self.assertRaises(ValueError):
+            BitParallelMatcher.from_regex(parse_regex('a' * 300))
+
+    def test_followpos_dfa(self):
+        for regex in REGEXES:
+            ast = parse_regex(regex)
+            expected = ast.thompson().subset_construction().minimize()
+            for char_ranges in (False, True):
+                dfa = followpos_dfa(ast, char_ranges=char_ranges)
+                if not char_ranges:
+                    self.assertEqual(dfa.S, expected.S, regex)
+                self.assertEqual(len(dfa.minimize().K), len(expected.K), regex)
+                for word in words({'a', 'b', 'c', 'x', '1'}, 5):
+                    self.assertEqual(dfa.accept(word), expected.accept(word), f'{regex!r} on {word!r}')
@@ -0,0 +1,33 @@
+import unittest
+
+from src.MultiPattern import MultiPattern
+from src.Regex import parse_regex
+
+
+PATTERNS = ['[a-z]+', 'ab*', 'a(b|c)', '[0-9]+', 'abc', '(ab)*', '[a-c]+']
+WORDS = ['', 'a', 'ab', 'abb', 'abc', 'ac', 'abab', 'cab', 'z', '123', '1a', 'é']
+
+
+class MultiPatternTests(unittest.TestCase):
+
+    def test_match_matches_each_pattern(self):
+        matcher = MultiPattern(PATTERNS)
+        dfas = [parse_regex(pattern).thompson().subset_construction() for pattern in PATTERNS]
+        for word in WORDS:
+            expected = frozenset(i for i, dfa in enumerate(dfas) if dfa.accept(word))
+            self.assertEqual(matcher.match(word), expected, word)
+
+    def test_minimize_keeps_tags_apart(self):
+        # both patterns accept exactly the same language shape, only the tags differ
+        matcher = MultiPattern(['a', 'b'])
+        self.assertEqual(matcher.match('a'), {0})
+        self.assertEqual(matcher.match('b'), {1})
+        self.assertEqual(len(matcher.dfa.K), 4)
+
+        merged = MultiPattern(['a|b'])
+        self.assertEqual(len(merged.dfa.K), 3)
+
+    def test_match_patterns(self):
+        matcher = MultiPattern(PATTERNS)
+        self.assertEqual(matcher.match_patterns('abc'), ['[a-z]+', 'abc', '[a-c]+'])
+        self.assertEqual(matcher.match_patterns(b'42'), ['[0-9]+'])
@@ -0,0 +1,119 @@
+import itertools
+import unittest
+
+from src.NFA import NFA
+from src.Regex import parse_regex
+
+
+def words(alphabet, max_length):
+    for length in range(max_length + 1):
+        for word in itertools.product(sorted(alphabet), repeat=length):
+            yield ''.join(word)
+
+
+class NFATests(unittest.TestCase):
+
+    def test_lazy_dfa(self):
+        for regex in ['(a|b)*a(a|b)(a|b)(a|b)', '(ab | cd+ | b*)? efg', 'c(a | b)+']:
+            nfa = parse_regex(regex).thompson()
+            dfa = nfa.subset_construction()
+            lazy = nfa.lazy_dfa()
+            for word in words(nfa.S | {'x'}, 5):
+                self.assertEqual(lazy.accept(word), dfa.accept(word), f'{regex!r} on {word!r}')
+
+    def test_lazy_dfa_bounded_cache(self):
+        nfa = parse_regex('(a|b)*a(a|b)(a|b)(a|b)(a|b)(a|b)(a|b)').thompson()
+        dfa = nfa.subset_construction()
+        lazy = nfa.lazy_dfa(max_states=4)
+        for word in words({'a', 'b'}, 9):
+            self.assertEqual(lazy.accept(word), dfa.accept(word), word)
+            self.assertLessEqual(len(lazy.cache), 4)
+        self.assertGreater(lazy.evictions, 0)
+
+    def test_epsilon_closures(self):
+        nfa = NFA(
+            {'a', 'b'},
+            {0, 1, 2, 3, 4, 5, 6},
+            0,
+            {
+                (0, ''): {1, 2},
+                (1, ''): {0},
+                (2, ''): {4, 6},
+                (3, ''): {1},
+                (4, 'a'): {5},
+                (5, ''): {3},
+                (6, 'b'): {7},
+                (7, ''): {3}
+            },
+            {1},
+        )
+        closures = nfa.epsilon_closures()
+        for state in range(8):
+            self.assertEqual(closures[state], nfa.epsilon_closure(state), state)
+        # 0 and 1 form one epsilon cycle and share their closure
+        self.assertIs(closures[0], closures[1])
+
+    def test_epsilon_closures_deep_chain(self):
+        n = 50000
+        d = {(i, ''): {i + 1} for i in range(n)}
+        d[(n, '')] = {0}
+        nfa = NFA(set(), set(range(n + 1)), 0, d, {n})
+        closures = nfa.epsilon_closures()
+        self.assertEqual(len(closures[n // 2]), n + 1)
+
+    def test_bitset_subset_construction(self):
+        for regex in ['(a|b)*a(a|b)(a|b)(a|b)', '(ab | cd+ | b*)? efg', 'c(a | b)+', '[A-Z]?([a-z]*[0-9])*']:
+            nfa = parse_regex(regex).thompson()
+            dfa = nfa.subset_construction()
+            bits = nfa.subset_construction(bitset=True)
+            self.assertEqual(len(bits.K), len(dfa.K), regex)
+            self.assertTrue(all(isinstance(state, int) for state in bits.K))
+            self.assertEqual(len(bits.minimize().K), len(dfa.minimize().K), regex)
+            for word in words(set('abcdefg') | {'x'}, 4):
+                self.assertEqual(bits.accept(word), dfa.accept(word), f'{regex!r} on {word!r}')
+
+    def test_parallel_subset_construction(self):
+        import src.NFA
+        threshold = src.NFA.PARALLEL_FRONTIER
+        src.NFA.PARALLEL_FRONTIER = 2  # force even small frontiers through the pool
+        try:
+            for regex, char_ranges in [('(a|b)*a(a|b)(a|b)(a|b)', False), ('(ab | cd+ | b*)? efg', False),
+                                       ('[a-f]*[c-k]x|[0-9]+', True), ('c*', False)]:
+                nfa = parse_regex(regex).thompson(char_ranges=char_ranges)
+                self.assertEqual(nfa.subset_construction(workers=2), nfa.subset_construction(), regex)
+                self.assertEqual(nfa.subset_construction(bitset=True, workers=2),
+                                 nfa.subset_construction(bitset=True), regex)
+        finally:
+            src.NFA.PARALLEL_FRONTIER = threshold
+
+    def test_optimize(self):
+        for regex in ['(a|b)*a(a|b)(a|b)(a|b)', '(ab | cd+ | b*)? efg', 'c(a | b)+', '(a|b)*(a|b)*c?',
+                      'a*|b*', '((a|b)(a|b))*', 'ab|ac|ad']:
+            nfa = parse_regex(regex).thompson()
+            dfa = nfa.subset_construction()
+            for simulation in (False, True):
+                optimized = nfa.optimize(simulation=simulation)
+                self.assertFalse(any(symbol == '' for _, symbol in optimized.d), regex)
+                self.assertLess(len(optimized.K), len(nfa.K), regex)
+                optimized_dfa = optimized.subset_construction()
+                for word in words(nfa.S | {'x'}, 5):
+                    self.assertEqual(optimized_dfa.accept(word), dfa.accept(word), f'{regex!r} on {word!r}')
+
+    def test_prune_and_merge(self):
+        # 3 is unreachable, 4 cannot reach a final state, 1 and 2 are identical
+        nfa = NFA(S={'a', 'b'}, K={0, 1, 2, 3, 4, 5}, q0=0,
+                  d={(0, 'a'): {1}, (0, 'b'): {2, 4}, (1, 'a'): {5}, (2, 'a'): {5}, (3, 'a'): {5}, (4, 'b'): {4}},
+                  F={5})
+        self.assertEqual(nfa.prune().K, {0, 1, 2, 5})
+        merged = nfa.prune().merge_equivalent()
+        self.assertEqual(len(merged.K), 3)
+        self.assertEqual(len(merged.d[(merged.q0, 'a')] | merged.d[(merged.q0, 'b')]), 1)
+
+    def test_simulation_drops_little_brothers(self):
+        # 2 accepts a subset of what 1 accepts, so 0 -a-> 2 is redundant
+        nfa = NFA(S={'a', 'b'}, K={0, 1, 2, 3}, q0=0,
+                  d={(0, 'a'): {1, 2}, (1, 'a'): {3}, (1, 'b'): {3}, (2, 'a'): {3}},
+                  F={3})
+        reduced = nfa.reduce_by_simulation().prune()
+        self.assertEqual(reduced.d[(0, 'a')], {1})
+        self.assertEqual(reduced.K, {0, 1, 3})
@@ -0,0 +1,54 @@
+import os
+import random
+import tempfile
+import unittest
+
+from src.Parallel import ParallelMatcher
+from src.Regex import parse_regex
+
+
+class ParallelTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dfa = parse_regex('(a|b)*abb|[0-9]+').thompson().subset_construction().minimize()
+        rng = random.Random(0)
+        self.words = [''.join(rng.choice('ab1') for _ in range(rng.randrange(8))) for _ in range(2000)]
+
+    def test_accept_many_in_order(self):
+        with ParallelMatcher(self.dfa.compile(), workers=2, chunk_size=64) as matcher:
+            self.assertEqual(matcher.accept_many(self.words), [self.dfa.accept(word) for word in self.words])
+            self.assertEqual(matcher.accept_many([]), [])
+            self.assertEqual(matcher.accept_many([b'aabb', b'12', b'ab']), [True, True, False])
+
+    def test_match_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'input.txt')
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                f.write('\n'.join(self.words[:300]) + '\r\n')
+
+            expected = [self.dfa.accept(word) for word in self.words[:300]]
+            with ParallelMatcher(self.dfa.compile(), workers=2, chunk_size=16) as matcher:
+                self.assertEqual(list(matcher.match_file(path)), expected)
+                self.assertEqual(list(matcher.match_file(path, encoding=None)), expected)
+
+    def test_state_map(self):
+        compiled = self.dfa.compile()
+        for word in self.words[:200]:
+            state_map = compiled.state_map(word)
+            for k in range(compiled.n_states):
+                self.assertEqual(state_map[k], compiled.run(word, k * compiled.stride))
+
+    def test_chunked_single_input(self):
+        rng = random.Random(1)
+        texts = [''.join(rng.choice('ab') for _ in range(2000)) + tail for tail in ('abb', 'ab', '')] + ['', '7']
+        with ParallelMatcher(self.dfa.compile(), workers=2) as matcher:
+            for text in texts:
+                self.assertEqual(matcher.run(text, n_chunks=7), self.dfa.compile().run(text))
+                self.assertEqual(matcher.accept(text.encode()), self.dfa.accept(text))
+
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'input.txt')
+                for text in texts:
+                    with open(path, 'w', encoding='latin-1') as f:
+                        f.write(text)
+                    self.assertEqual(matcher.accept_file(path, n_chunks=5), self.dfa.accept(text))
@@ -0,0 +1,68 @@
+import threading
+import unittest
+
+from src import PatternCache as pattern_cache
+from src.PatternCache import PatternCache
+
+
+class PatternCacheTests(unittest.TestCase):
+
+    def test_hits_and_misses(self):
+        cache = PatternCache()
+        dfa = cache.get('c(a | b)+')
+        self.assertIs(cache.get('c(a | b)+'), dfa)
+        self.assertTrue(dfa.accept('cab'))
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.entries), (1, 1, 1))
+        self.assertEqual(stats.states, len(dfa.K))
+
+    def test_eviction_by_entries(self):
+        cache = PatternCache(max_entries=2)
+        cache.get('a')
+        cache.get('b')
+        cache.get('a')
+        cache.get('c')
+        self.assertEqual(list(cache.entries), ['a', 'c'])
+        self.assertEqual(cache.stats().evictions, 1)
+
+    def test_eviction_by_states(self):
+        cache = PatternCache(max_states=5)
+        cache.get('abc')
+        cache.get('def')
+        self.assertEqual(list(cache.entries), ['def'])
+        self.assertLessEqual(cache.stats().states, 5)
+
+    def test_invalidate(self):
+        cache = PatternCache()
+        first = cache.get('ab')
+        cache.get('cd')
+        cache.invalidate('ab')
+        self.assertIsNot(cache.get('ab'), first)
+        cache.invalidate()
+        self.assertEqual(cache.stats().entries, 0)
+        self.assertEqual(cache.stats().states, 0)
+
+    def test_threads(self):
+        cache = PatternCache(max_entries=3)
+        patterns = {'a+': 'aa', 'b*': '', '(ab)*': 'abab', 'c?': 'c', 'a|b': 'b'}
+        failures = []
+
+        def work():
+            for _ in range(50):
+                for pattern, word in patterns.items():
+                    if not cache.get(pattern).accept(word):
+                        failures.append(pattern)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(failures, [])
+        stats = cache.stats()
+        self.assertEqual(stats.hits + stats.misses, 4 * 50 * len(patterns))
+        self.assertLessEqual(stats.entries, 3)
+
+    def test_module_compile(self):
+        self.assertIs(pattern_cache.compile('[0-9]+'), pattern_cache.compile('[0-9]+'))
@@ -0,0 +1,83 @@
+import random
+import unittest
+
+from src.Prefilter import MAX_LITERAL_LENGTH, MAX_REQUIRED, AhoCorasick, Prefilter, PrefilteredDFA, analyze
+from src.Regex import parse_regex
+from src.Search import Searcher
+
+
+PATTERNS = ['ERROR[0-9]+', 'ab|ac', '(ab|cd)x*', 'a*bc', 'x(a|b)*yz', '[ab]c+', 'a?', 'b+a', '(a|b)*c']
+
+
+class PrefilterTests(unittest.TestCase):
+
+    def test_literals(self):
+        prefilter = Prefilter.from_regex(parse_regex('ERROR[0-9]+'))
+        self.assertEqual(prefilter.prefixes, {'ERROR0', 'ERROR1', 'ERROR2', 'ERROR3', 'ERROR4',
+                                              'ERROR5', 'ERROR6', 'ERROR7', 'ERROR8', 'ERROR9'})
+        self.assertEqual(prefilter.required, 'ERROR')
+
+        prefilter = Prefilter.from_regex(parse_regex('a*bc'))
+        self.assertIsNone(prefilter.prefixes)
+        self.assertEqual(prefilter.required, 'bc')
+
+        prefilter = Prefilter.from_regex(parse_regex('(a|b)*'))
+        self.assertIsNone(prefilter.prefixes)
+        self.assertEqual(prefilter.required, '')
+
+    def test_long_literal_is_bounded(self):
+        info = analyze(parse_regex('a' * 5000))
+        self.assertIsNone(info.exact)
+        self.assertLessEqual(len(info.required), MAX_REQUIRED)
+        self.assertIn('a' * MAX_LITERAL_LENGTH, info.required)
+        self.assertEqual(info.prefixes, {'a' * MAX_LITERAL_LENGTH})
+
+    def test_aho_corasick(self):
+        automaton = AhoCorasick(['he', 'she', 'his', 'hers'])
+        self.assertEqual(automaton.find('ushers'), 1)
+        self.assertEqual(automaton.find('ushers', 2), 2)
+        self.assertEqual(automaton.find('ushers', 3), -1)
+        self.assertEqual(AhoCorasick(['bcd', 'abcde']).find('xabcde'), 1)
+
+    def test_search_matches_unfiltered(self):
+        rng = random.Random(0)
+        for pattern in PATTERNS:
+            regex = parse_regex(pattern)
+            dfa = regex.thompson().subset_construction().minimize()
+            plain = Searcher(dfa.compile())
+            filtered = PrefilteredDFA(regex, dfa)
+            for _ in range(100):
+                text = ''.join(rng.choice('abcdxyz') for _ in range(rng.randrange(20)))
+                self.assertEqual(list(filtered.finditer(text)), list(plain.finditer(text)), f'{pattern!r} in {text!r}')
+                self.assertEqual(list(filtered.finditer(text.encode())), list(plain.finditer(text)))
+                self.assertEqual(filtered.accept(text), dfa.accept(text))
+
+    def test_skips_to_candidates(self):
+        regex = parse_regex('ERROR[0-9]+')
+        filtered = PrefilteredDFA(regex, regex.thompson().subset_construction().minimize())
+        text = ('info ' * 1000 + 'ERROR42 ') * 50
+        spans = list(filtered.finditer(text))
+        self.assertEqual(len(spans), 50)
+        self.assertTrue(all(text[start:end].startswith('ERROR') for start, end in spans))
+        self.assertFalse(filtered.accept('ERROR'))
+        self.assertTrue(filtered.accept(b'ERROR7'))
+
+    def test_required_literal_searched_once(self):
+        class Text(str):
+            searches = 0
+
+            def find(self, sub, *args):
+                if sub == 'QQQQ':
+                    Text.searches += 1
+                return super().find(sub, *args)
+
+        regex = parse_regex('xyz(a|b)*QQQQ')
+        filtered = PrefilteredDFA(regex, regex.thompson().subset_construction().minimize())
+        text = Text('xyzd' * 2000 + 'xyzQQQQ')
+        self.assertEqual(list(filtered.finditer(text)), [(8000, 8007)])
+        self.assertLessEqual(Text.searches, 3)
+
+        prefilter = filtered.prefilter
+        self.assertEqual(prefilter.next_candidate(text, 5), (8, 8003))
+        self.assertEqual(prefilter.next_candidate('xyzQQQQ', 1), (-1, 3))
+        self.assertEqual(prefilter.next_candidate('xyzxyz', 0), (-1, -1))
@@ -0,0 +1,123 @@
+import unittest
+
+from src.CharSet import CharSet
+from src.Regex import CharClass, Character, Concatenation, Epsilon, Union, parse_regex, simplify
+
+
+class RegexTests(unittest.TestCase):
+
+    def test_thompson_size_is_linear(self):
+        for n in [10, 100, 800]:
+            nfa = parse_regex('ab' * (n // 2)).thompson()
+            self.assertEqual(len(nfa.K), 2 * n)
+            self.assertEqual(sum(len(targets) for targets in nfa.d.values()), 2 * n - 1)
+
+    def test_thompson_shared_table(self):
+        nfa = parse_regex('(ab | cd)*').thompson()
+        self.assertEqual(nfa.K, set(range(len(nfa.K))))
+        self.assertEqual(nfa.S, {'a', 'b', 'c', 'd'})
+        dfa = nfa.subset_construction()
+        for word, expected in [('', True), ('ab', True), ('abcd', True), ('ac', False), ('abc', False)]:
+            self.assertEqual(dfa.accept(word), expected, word)
+
+    def test_thompson_deep_pattern(self):
+        regex = '(a|b)+c?' * 20000
+        nfa = parse_regex(regex).thompson()
+        self.assertEqual(nfa.S, {'a', 'b', 'c'})
+
+        nested = '(' * 5000 + 'a' + ')*' * 5000
+        dfa = parse_regex(nested).thompson().subset_construction().minimize()
+        self.assertTrue(dfa.accept('aaa'))
+
+    def test_plus_shares_subgraph(self):
+        plus = parse_regex('(ab | cd)+').thompson()
+        single = parse_regex('(ab | cd)').thompson()
+        self.assertEqual(len(plus.K), len(single.K))
+        dfa = plus.subset_construction()
+        for word, expected in [('', False), ('ab', True), ('abcdab', True), ('abc', False)]:
+            self.assertEqual(dfa.accept(word), expected, word)
+
+    def test_char_class_is_one_node(self):
+        ast = parse_regex('[a-z0-9_]')
+        self.assertIsInstance(ast, CharClass)
+        self.assertEqual(ast.charset.ranges, ((ord('0'), ord('9')), (ord('_'), ord('_')), (ord('a'), ord('z'))))
+        with self.assertRaises(ValueError):
+            parse_regex('[a-z')
+
+    def test_char_ranges(self):
+        regex = '[Ѐ-ӿ]+x[a-z]*|[b-d]y'
+        nfa = parse_regex(regex).thompson(char_ranges=True)
+        expanded = parse_regex(regex).thompson()
+        self.assertEqual(len(nfa.K), len(expanded.K))
+        self.assertLess(len(nfa.S), 10)
+        self.assertGreater(len(expanded.S), 256)
+
+        dfa = nfa.subset_construction().minimize()
+        reference = expanded.subset_construction().minimize()
+        self.assertEqual(len(dfa.K), len(reference.K))
+        self.assertTrue(any(isinstance(symbol, CharSet) for symbol in dfa.S))
+
+        lazy = nfa.lazy_dfa()
+        for word in ['Жx', 'ЀӿxabC', 'Жxab', 'by', 'cy', 'ay', 'x', 'Ж', 'Жxé', 'dy']:
+            self.assertEqual(dfa.accept(word), reference.accept(word), word)
+            self.assertEqual(lazy.accept(word), reference.accept(word), word)
+        self.assertEqual(list(dfa.accept_many(['Жx', 'by', 'ay'])), [True, True, False])
+
+    def test_charset_partition(self):
+        pieces = CharSet.partition([CharSet.from_ranges([(97, 122)]), 'c', CharSet.from_ranges([(120, 130)])])
+        self.assertEqual(pieces['c'], ['c'])
+        self.assertEqual([str(piece) for piece in pieces[CharSet.from_ranges([(97, 122)])]],
+                         ['[a-b]', 'c', '[d-w]', '[x-z]'])
+
+    def test_nodes_are_interned(self):
+        regex = parse_regex('(a|b)c(a|b)')
+        self.assertIs(regex.r1.r1, regex.r2)
+        self.assertIs(parse_regex('x(y|z)*'), parse_regex('x(y|z)*'))
+        self.assertIs(Union(Character('a'), Character('b')), regex.r2)
+        self.assertEqual(len({parse_regex('ab'), parse_regex('ab'), parse_regex('ba')}), 2)
+        with self.assertRaises(AttributeError):
+            regex.r1 = Epsilon()
+
+    def test_simplify(self):
+        cases = {
+            'a**': 'a*',
+            '(a+)*': 'a*',
+            '(a|a)': 'a',
+            'x|y|x': 'x|y',
+            'ab|ac|ad': 'a(b|c|d)',
+            'abc|abd|ab': 'ab(c|d)?',
+            '(a*)?': 'a*',
+        }
+        for regex, expected in cases.items():
+            self.assertIs(simplify(parse_regex(regex)), parse_regex(expected), regex)
+        self.assertIs(simplify(Concatenation(Epsilon(), Character('a'))), Character('a'))
+
+    def test_simplify_long_chains(self):
+        literal = parse_regex('ab' * 5000)
+        self.assertIs(simplify(literal), literal)
+        keywords = '|'.join(f'key{i}' for i in range(2000))
+        simplified = simplify(parse_regex(keywords))
+        self.assertIsInstance(simplified, Concatenation)
+        dfa = simplified.thompson().subset_construction()
+        for word in ['key0', 'key1999', 'key2000', 'key', 'ke1']:
+            self.assertEqual(dfa.accept(word), word in {'key0', 'key1999'}, word)
+
+    def test_simplify_deep_factoring(self):
+        # x|xx|xxx|... factors into x(x(x...)?)?, one nested union per alternative
+        x = Character('x')
+        chain = ladder = x
+        for _ in range(1099):
+            chain = Concatenation(chain, x)
+            ladder = Union(ladder, chain)
+        dfa = simplify(ladder).thompson().subset_construction()
+        for word in ['', 'x', 'x' * 1100, 'x' * 1101]:
+            self.assertEqual(dfa.accept(word), 1 <= len(word) <= 1100, len(word))
+
+    def test_simplify_keeps_language(self):
+        for regex in ['(ab | cd+ | b*)? efg', 'abc|abd|ab|b', '((a|b)*)*c|(a|b)*d', 'a(b|b)*c|ab', '(a?)+']:
+            ast = parse_regex(regex)
+            expected = ast.thompson().subset_construction().minimize()
+            dfa = ast.simplify().thompson().subset_construction().minimize()
+            self.assertEqual(len(dfa.K), len(expected.K), regex)
+            for word in ['', 'a', 'ab', 'abc', 'abd', 'abbc', 'bd', 'cddefg', 'efg', 'ababc', 'aa']:
+                self.assertEqual(dfa.accept(word), expected.accept(word), f'{regex!r} on {word!r}')
@@ -0,0 +1,67 @@
+import random
+import unittest
+
+from src.Regex import parse_regex
+from src.Search import Searcher, finditer
+
+
+def reference(dfa, text):
+    pos = 0
+    while pos <= len(text):
+        for start in range(pos, len(text) + 1):
+            ends = [end for end in range(start, len(text) + 1) if dfa.accept(text[start:end])]
+            if ends:
+                break
+        else:
+            return
+        yield start, ends[-1]
+        pos = ends[-1] if ends[-1] > start else ends[-1] + 1
+
+
+PATTERNS = ['ab', 'a*', 'abcd|bc', 'ab|bcd', '(a|b)*c', 'a+b?', 'ba*|aab', '[0-9]+(\\.[0-9]+)?', 'x?']
+
+
+class SearchTests(unittest.TestCase):
+
+    def test_matches_reference(self):
+        rng = random.Random(0)
+        for pattern in PATTERNS:
+            dfa = parse_regex(pattern).thompson().subset_construction().minimize()
+            searcher = Searcher(dfa.compile())
+            for _ in range(60):
+                text = ''.join(rng.choice('abcd.1x') for _ in range(rng.randrange(12)))
+                self.assertEqual(list(searcher.finditer(text)), list(reference(dfa, text)), f'{pattern!r} in {text!r}')
+
+    def test_leftmost_longest(self):
+        dfa = parse_regex('abcd|bc').thompson().subset_construction().minimize()
+        self.assertEqual(list(finditer(dfa, 'xabcdbc')), [(1, 5), (5, 7)])
+        dfa = parse_regex('ab|bcd').thompson().subset_construction().minimize()
+        self.assertEqual(list(finditer(dfa, 'abcd')), [(0, 2)])
+
+    def test_bytes_and_small_cache(self):
+        dfa = parse_regex('[0-9]+').thompson().subset_construction().minimize()
+        searcher = Searcher(dfa.compile(), cache_limit=2)
+        self.assertEqual(list(searcher.finditer(b'ab12c345')), [(2, 4), (5, 8)])
+        self.assertEqual(list(searcher.finditer('x9' * 5)), [(1, 2), (3, 4), (5, 6), (7, 8), (9, 10)])
+
+    def test_long_text(self):
+        dfa = parse_regex('ERROR[0-9]+').thompson().subset_construction().minimize()
+        text = ('info ' * 1000 + 'ERROR42 ') * 50
+        spans = list(finditer(dfa, text))
+        self.assertEqual(len(spans), 50)
+        self.assertTrue(all(text[start:end].startswith('ERROR') for start, end in spans))
+
+    def test_stops_at_dead_end_inside_alphabet(self):
+        class Text(str):
+            reads = 0
+
+            def __getitem__(self, key):
+                Text.reads += 1
+                return super().__getitem__(key)
+
+        # every character of the text is in the alphabet, so only the
+        # compiled empty-set sink tells the scan that a thread has died
+        dfa = parse_regex('ab').thompson().subset_construction().minimize()
+        text = Text('ab' * 4000)
+        self.assertEqual(len(list(finditer(dfa, text))), 4000)
+        self.assertLessEqual(Text.reads, 3 * len(text))